@@ -0,0 +1,233 @@
+'''
+Quote generation benchmark.
+
+    python benchmarks/quotes.py [--runs 5] [--json results.json]
+    python benchmarks/quotes.py --compare baseline.json [--threshold 0.1]
+    python benchmarks/quotes.py --compare baseline.json --current results.json
+
+Every fixture in benchmarks/fixtures.jsonl (batch request format, see
+quote_engine.batch) is measured in a fresh interpreter with an empty
+QUOTE_CACHE_DIR, so nothing carries over from earlier runs or the repo's
+own cache:
+
+  breakdown_per_s  calculate_price_breakdown() calls per second
+  table_cold       first raster price table (save_df_as_image()) of the
+                   process, matplotlib import included
+  table            median raster price table of --runs more, each rendered
+                   again with the memory and disk caches emptied first
+  docx_cold        first DOCX render of the process (template parse, image
+                   derivatives built from scratch)
+  docx             median DOCX render of --runs more
+  pptx_cold        first PPTX build of the process
+  pptx             median PPTX build of --runs more
+  table_bytes      size of the price table PNG
+  docx_bytes       size of the DOCX
+  pptx_bytes       size of the PPTX
+  peak_alloc_mb    peak Python allocations (tracemalloc) during one DOCX
+                   and one PPTX render
+  max_rss_mb       peak resident memory of the process
+
+Documents are rendered with quote_engine.api.render_docx/render_pptx, which
+bypass the artifact cache. --compare checks the results against an earlier
+--json file and exits with 1 if any metric got worse by more than
+--threshold (a fraction, default 0.1); --current compares two files without
+running anything.
+'''
+import argparse
+import json
+import os
+import platform
+import statistics
+import subprocess
+import sys
+import tempfile
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+FIXTURES_PATH = os.path.join(BASE_DIR, "benchmarks", "fixtures.jsonl")
+
+# metric -> True if higher is better
+METRICS = {
+    "breakdown_per_s": True,
+    "table_cold": False,
+    "table": False,
+    "docx_cold": False,
+    "docx": False,
+    "pptx_cold": False,
+    "pptx": False,
+    "table_bytes": False,
+    "docx_bytes": False,
+    "pptx_bytes": False,
+    "peak_alloc_mb": False,
+    "max_rss_mb": False,
+}
+SECONDS = ("table_cold", "table", "docx_cold", "docx", "pptx_cold", "pptx")
+
+
+def load_fixtures(path=FIXTURES_PATH):
+    """{id: quote dict} in file order."""
+    fixtures = {}
+    with open(path, encoding="utf-8") as f:
+        for line in f:
+            if line.strip():
+                data = json.loads(line)
+                fixtures[data.pop("id")] = data
+    return fixtures
+
+
+def _max_rss_mb():
+    try:
+        import resource
+    except ImportError:  # Windows
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return rss / (1024 * 1024) if sys.platform == "darwin" else rss / 1024
+
+
+def measure(fixture_id, runs, breakdown_iterations):
+    """Measure one fixture in this process; returns {metric: value}."""
+    import shutil
+    import time
+    import tracemalloc
+
+    sys.path.insert(0, BASE_DIR)
+    from quote_engine import price_table
+    from quote_engine.api import price_quote, render_docx, render_pptx, resolve_quote_layout, validate
+    from quote_engine.pricing import calculate_price_breakdown
+
+    quote = validate(load_fixtures()[fixture_id])
+    priced = price_quote(quote)
+    layout, _notes = resolve_quote_layout(quote)
+    result = {}
+
+    calculate_price_breakdown(quote)
+    started = time.perf_counter()
+    for _ in range(breakdown_iterations):
+        calculate_price_breakdown(quote)
+    result["breakdown_per_s"] = breakdown_iterations / (time.perf_counter() - started)
+
+    times = []
+    for _ in range(runs + 1):
+        price_table._rasters.clear()
+        shutil.rmtree(price_table.RASTER_DIR, ignore_errors=True)
+        started = time.perf_counter()
+        data = price_table.save_df_as_image(priced.table, priced.currency).getvalue()
+        times.append(time.perf_counter() - started)
+    result["table_cold"] = times[0]
+    result["table"] = statistics.median(times[1:])
+    result["table_bytes"] = len(data)
+
+    for kind, render in (("docx", render_docx), ("pptx", render_pptx)):
+        times = []
+        for _ in range(runs + 1):
+            started = time.perf_counter()
+            data = render(quote, priced, layout)
+            times.append(time.perf_counter() - started)
+        result[f"{kind}_cold"] = times[0]
+        result[kind] = statistics.median(times[1:])
+        result[f"{kind}_bytes"] = len(data)
+
+    tracemalloc.start()
+    render_docx(quote, priced, layout)
+    render_pptx(quote, priced, layout)
+    result["peak_alloc_mb"] = tracemalloc.get_traced_memory()[1] / (1024 * 1024)
+    tracemalloc.stop()
+    result["max_rss_mb"] = _max_rss_mb()
+    return result
+
+
+def run_fixture(fixture_id, runs, breakdown_iterations):
+    with tempfile.TemporaryDirectory() as cache_dir:
+        env = dict(os.environ, QUOTE_CACHE_DIR=cache_dir)
+        out = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--child", fixture_id,
+             "--runs", str(runs), "--breakdown-iterations", str(breakdown_iterations)],
+            capture_output=True, text=True, check=True, cwd=BASE_DIR, env=env,
+        )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def _format(metric, value):
+    if value is None:
+        return "-"
+    if metric in SECONDS:
+        return f"{value * 1000:.0f} ms"
+    if metric.endswith("_bytes"):
+        return f"{value / 1024:.0f} KB"
+    if metric.endswith("_mb"):
+        return f"{value:.1f} MB"
+    return f"{value:,.0f}"
+
+
+def compare(baseline, current, threshold):
+    """[(fixture, metric, old, new, change, regressed)] for metrics in both."""
+    rows = []
+    for fixture_id, metrics in current["fixtures"].items():
+        old_metrics = baseline["fixtures"].get(fixture_id, {})
+        for metric, higher_is_better in METRICS.items():
+            old, new = old_metrics.get(metric), metrics.get(metric)
+            if not old or new is None:
+                continue
+            change = (new - old) / old
+            worse = -change if higher_is_better else change
+            rows.append((fixture_id, metric, old, new, change, worse > threshold))
+    return rows
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure quote pricing and document generation per fixture.")
+    parser.add_argument("--runs", type=int, default=5, help="warm renders per document after the first (default: 5)")
+    parser.add_argument("--breakdown-iterations", type=int, default=2000,
+                        help="calculate_price_breakdown() calls to time (default: 2000)")
+    parser.add_argument("--fixture", action="append", default=None, help="only this fixture id (repeatable)")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    parser.add_argument("--compare", default=None, metavar="BASELINE", help="flag regressions against this results file")
+    parser.add_argument("--current", default=None, help="with --compare: results file to check instead of running")
+    parser.add_argument("--threshold", type=float, default=0.1, help="allowed relative slowdown/growth (default: 0.1)")
+    parser.add_argument("--child", default=None, help=argparse.SUPPRESS)
+    args = parser.parse_args(argv)
+
+    if args.child:
+        print(json.dumps(measure(args.child, args.runs, args.breakdown_iterations)))
+        return 0
+
+    if args.current:
+        with open(args.current, encoding="utf-8") as f:
+            results = json.load(f)
+    else:
+        fixture_ids = args.fixture or list(load_fixtures())
+        results = {
+            "meta": {
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+                "cpus": os.cpu_count(),
+                "runs": args.runs,
+                "breakdown_iterations": args.breakdown_iterations,
+            },
+            "fixtures": {},
+        }
+        for fixture_id in fixture_ids:
+            metrics = results["fixtures"][fixture_id] = run_fixture(fixture_id, args.runs, args.breakdown_iterations)
+            print(fixture_id)
+            for metric in METRICS:
+                print(f"  {metric:<16}{_format(metric, metrics.get(metric)):>12}")
+        if args.json:
+            with open(args.json, "w", encoding="utf-8") as f:
+                json.dump(results, f, indent=2)
+
+    if not args.compare:
+        return 0
+    with open(args.compare, encoding="utf-8") as f:
+        baseline = json.load(f)
+    rows = compare(baseline, results, args.threshold)
+    regressions = [row for row in rows if row[5]]
+    print(f"\ncompared with {args.compare} (threshold {args.threshold:.0%})")
+    for fixture_id, metric, old, new, change, regressed in rows:
+        flag = "  REGRESSION" if regressed else ""
+        print(f"  {fixture_id:<28}{metric:<16}{_format(metric, old):>12} -> {_format(metric, new):>12}"
+              f"  {change:+7.1%}{flag}")
+    print(f"{len(regressions)} regression(s)")
+    return 1 if regressions else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,86 @@
+'''
+Startup benchmark for the Streamlit app.
+
+    python benchmarks/startup.py [--runs 5] [--json results.json]
+
+Every run starts a fresh interpreter and measures:
+
+  import_streamlit  importing streamlit itself
+  first_render      the first script run, i.e. what a new process makes the
+                    first visitor wait for before the form shows (includes
+                    app.py's own imports)
+  rerun             a second script run, what every widget change costs
+
+and lists the heavy libraries that were loaded just to render the form
+(none of them should be: they belong to quote generation).
+'''
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+APP_PATH = os.path.join(BASE_DIR, "app.py")
+
+HEAVY_MODULES = ["pandas", "matplotlib", "docx", "docxtpl", "pptx", "PIL", "numpy"]
+
+_CHILD = r"""
+import json, os, sys, time
+os.chdir({base_dir!r})
+sys.path.insert(0, {base_dir!r})
+t0 = time.perf_counter()
+import streamlit
+t1 = time.perf_counter()
+from streamlit.testing.v1 import AppTest
+at = AppTest.from_file({app_path!r}, default_timeout=120)
+t2 = time.perf_counter()
+at.run()
+t3 = time.perf_counter()
+at.run()
+t4 = time.perf_counter()
+print(json.dumps({{
+    "import_streamlit": t1 - t0,
+    "first_render": t3 - t2,
+    "rerun": t4 - t3,
+    "exceptions": [str(e.value) for e in at.exception],
+    "loaded": [m for m in {heavy!r} if m in sys.modules],
+}}))
+"""
+
+
+def run_once():
+    code = _CHILD.format(base_dir=BASE_DIR, app_path=APP_PATH, heavy=HEAVY_MODULES)
+    out = subprocess.run([sys.executable, "-c", code], capture_output=True, text=True, check=True)
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Measure cold import and first-render time of app.py.")
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes to measure (default: 5)")
+    parser.add_argument("--json", default=None, help="also write the results to this file")
+    args = parser.parse_args(argv)
+
+    runs = [run_once() for _ in range(args.runs)]
+    summary = {
+        metric: statistics.median(r[metric] for r in runs)
+        for metric in ("import_streamlit", "first_render", "rerun")
+    }
+    summary["loaded_by_form"] = sorted({m for r in runs for m in r["loaded"]})
+    summary["exceptions"] = sorted({e for r in runs for e in r["exceptions"]})
+
+    for metric in ("import_streamlit", "first_render", "rerun"):
+        print(f"{metric:<18}{summary[metric] * 1000:8.0f} ms (median of {len(runs)})")
+    print(f"{'loaded by form':<18}{', '.join(summary['loaded_by_form']) or '-'}")
+    if summary["exceptions"]:
+        print("exceptions:", *summary["exceptions"], sep="\n  ")
+
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"summary": summary, "runs": runs}, f, indent=2)
+    return 1 if summary["exceptions"] else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
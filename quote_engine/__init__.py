@@ -0,0 +1,50 @@
+'''
+Quote engine for the Waste Robotics quote generator.
+
+Everything the Streamlit app does, without Streamlit: build a QuoteInput,
+then price_quote() for the line items and generate_quote() (or
+render_docx()/render_pptx()) for the documents as bytes.
+'''
+from quote_engine.api import (
+    PricedQuote,
+    QuoteDocuments,
+    QuoteValidationError,
+    generate_quote,
+    input_hash,
+    missing_fields,
+    price_quote,
+    render_docx,
+    render_pptx,
+    resolve_quote_layout,
+    running_total,
+    validate,
+)
+from quote_engine.pricing import (
+    CatalogEntry,
+    PriceCatalog,
+    PriceLine,
+    calculate_price_breakdown,
+    load_catalog,
+)
+from quote_engine.quote import QuoteInput
+
+__all__ = [
+    "CatalogEntry",
+    "PriceCatalog",
+    "PriceLine",
+    "PricedQuote",
+    "QuoteDocuments",
+    "QuoteInput",
+    "QuoteValidationError",
+    "calculate_price_breakdown",
+    "generate_quote",
+    "input_hash",
+    "load_catalog",
+    "missing_fields",
+    "price_quote",
+    "render_docx",
+    "render_pptx",
+    "resolve_quote_layout",
+    "running_total",
+    "validate",
+]
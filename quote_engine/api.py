@@ -0,0 +1,183 @@
+'''
+Streamlit-free entry points: validate and price a quote, render its documents.
+
+    from quote_engine import QuoteInput, generate_quote
+
+    quote = QuoteInput.from_dict(request)
+    documents = generate_quote(quote)
+    with open(f"{documents.basename}.docx", "wb") as f:
+        f.write(documents.docx)
+
+Every function takes a QuoteInput or a dict of form fields (see
+quote_engine.quote.DEFAULT_FIELDS). Document libraries are imported on first
+use, so importing this module stays cheap.
+'''
+import logging
+from collections import namedtuple
+
+from quote_engine import quote as _quote
+from quote_engine.quote import QuoteInput, quote_from_dict
+
+logger = logging.getLogger(__name__)
+
+# Breakdown in the quote currency: line_items is a list of dicts with
+# Component/Description/Unit Price/Qty/Subtotal, table the same as a DataFrame.
+PricedQuote = namedtuple("PricedQuote", "line_items table total currency multiplier")
+
+# Generated documents as bytes; basename is the download file name stem and
+# key the content hash they're cached under.
+QuoteDocuments = namedtuple("QuoteDocuments", "docx pptx basename key")
+
+
+class QuoteValidationError(ValueError):
+    """Required fields are empty. `missing` lists their form labels."""
+
+    def __init__(self, missing):
+        super().__init__("Missing required fields: " + ", ".join(missing))
+        self.missing = missing
+
+
+def as_quote(quote):
+    """The complete quote dict for a QuoteInput or (possibly partial) dict."""
+    if isinstance(quote, QuoteInput):
+        return quote.as_dict()
+    return quote_from_dict(quote)
+
+
+def missing_fields(quote):
+    """Labels of required fields left empty, in form order."""
+    return _quote.missing_fields(as_quote(quote))
+
+
+def input_hash(quote):
+    """Content hash of the quote's fields, e.g. to tell whether a form changed."""
+    from quote_engine.artifacts import quote_fingerprint
+
+    return quote_fingerprint(as_quote(quote))
+
+
+def validate(quote):
+    """Return the quote dict, or raise QuoteValidationError."""
+    quote = as_quote(quote)
+    missing = _quote.missing_fields(quote)
+    if missing:
+        raise QuoteValidationError(missing)
+    return quote
+
+
+def price_quote(quote):
+    """Priced line items and total, converted to the quote currency."""
+    from quote_engine import tracing
+
+    quote = as_quote(quote)
+    with tracing.span("pricing"):
+        df, total = _quote.price_table(quote)
+    return PricedQuote(
+        line_items=df.to_dict("records"),
+        table=df,
+        total=float(total),
+        currency=quote["currency"],
+        multiplier=_quote.currency_multiplier(quote),
+    )
+
+
+def running_total(quote):
+    """
+    (PriceLine tuple, total) in the quote currency, for a live price display.
+    Pure and memoized on the priced fields, and needs no pandas.
+    """
+    from quote_engine.pricing import freeze_inputs, price_snapshot
+
+    quote = as_quote(quote)
+    lines, total = price_snapshot(freeze_inputs(quote))
+    multiplier = _quote.currency_multiplier(quote)
+    if multiplier != 1.0:
+        lines = tuple(
+            line._replace(unit_price=line.unit_price * multiplier, subtotal=line.subtotal * multiplier)
+            for line in lines
+        )
+    return lines, total * multiplier
+
+
+def resolve_quote_layout(quote):
+    """(Layout, notes) of the images for the quote's configuration."""
+    from quote_engine import tracing
+    from quote_engine.assets import resolve_layout
+
+    quote = as_quote(quote)
+    with tracing.span("layout"):
+        return resolve_layout(quote["robot_type"], quote["gripper_type"], quote["disposition"], quote["vrs_model"])
+
+
+def render_docx(quote, priced=None, layout=None):
+    """The Word quote as bytes."""
+    from quote_engine.generate import render_docx as _render_docx
+
+    quote = validate(quote)
+    priced = priced or price_quote(quote)
+    layout = layout or resolve_quote_layout(quote)[0]
+    return _render_docx(quote, layout, priced.table, priced.total, None)
+
+
+def render_pptx(quote, priced=None, layout=None):
+    """The PowerPoint deck as bytes."""
+    from quote_engine.document import RASTER_PRICE_TABLE
+    from quote_engine.generate import render_pptx as _render_pptx
+
+    quote = validate(quote)
+    priced = priced or price_quote(quote)
+    layout = layout or resolve_quote_layout(quote)[0]
+    df = None if RASTER_PRICE_TABLE else priced.table
+    return _render_pptx(quote, layout, priced.total, priced.multiplier, df=df)
+
+
+def generate_quote(quote, priced=None, layout=None, progress=None, use_cache=True, on_slide=None):
+    """
+    Validate, price and render both documents (concurrently, see
+    quote_engine.generate). Finished documents are reused from the artifact
+    cache when `use_cache` and copied to QUOTE_OUTPUT_DIR if that is set
+    (a failed copy is logged, not raised).
+    `priced`/`layout` skip recomputing what the caller already has;
+    `progress` and `on_slide` are passed to generate_documents(), and
+    `progress` also gets a "save" task for storing the results. The whole
+    call is a "quote" span in quote_engine.tracing.
+    """
+    import time
+
+    from quote_engine import artifacts, output, tracing
+    from quote_engine.document import RASTER_PRICE_TABLE
+    from quote_engine.generate import generate_documents
+
+    with tracing.span("quote") as sp:
+        quote = validate(quote)
+        priced = priced or price_quote(quote)
+        layout = layout or resolve_quote_layout(quote)[0]
+
+        key = artifacts.artifact_key(quote, raster_table=RASTER_PRICE_TABLE)
+        documents = {kind: artifacts.get(key, kind) if use_cache else None for kind in ("docx", "pptx")}
+        to_build = [kind for kind, data in documents.items() if data is None]
+        sp.attrs.update(key=key[:16], built=to_build)
+        if to_build:
+            documents.update(generate_documents(
+                quote, layout, priced.table, priced.total, priced.multiplier,
+                kinds=to_build, raster_table=RASTER_PRICE_TABLE, progress=progress, on_slide=on_slide,
+            ))
+        sp.bytes = sum(len(data) for data in documents.values())
+
+        started = time.perf_counter()
+        if progress is not None:
+            progress("save", "running", 0.0, 1.0)
+        with tracing.span("save"):
+            if use_cache:
+                for kind in to_build:
+                    artifacts.put(key, kind, documents[kind])
+            basename = _quote.output_basename(quote)
+            for kind, data in documents.items():
+                try:
+                    output.spill(f"{basename}_{key[:8]}.{kind}", data)
+                except OSError as exc:
+                    # The documents are built and returned either way.
+                    logger.warning("could not copy %s to QUOTE_OUTPUT_DIR: %s", kind, exc)
+        if progress is not None:
+            progress("save", "done", time.perf_counter() - started, 1.0)
+    return QuoteDocuments(docx=documents["docx"], pptx=documents["pptx"], basename=basename, key=key)
@@ -0,0 +1,175 @@
+'''
+Disk cache of finished quote documents.
+
+Generating the same quote twice (a failed download, a refreshed tab) should
+not rebuild the DOCX and PPTX. artifact_key() hashes the full quote together
+with the versions of everything the output depends on: the pricing catalog,
+the DOCX template, the image assets and the quote_engine code itself, taken
+from the caches that already track them, so a key costs no directory walk. The
+bytes are stored as CACHE_DIR/artifacts/<key>.<kind>; the cache is an LRU by
+file mtime, capped at QUOTE_ARTIFACT_CACHE_MB (0 turns it off).
+'''
+import datetime
+import functools
+import hashlib
+import json
+import os
+import threading
+
+from quote_engine.manifest import get_manifest
+from quote_engine.paths import CACHE_DIR, cache_path, resolve_path
+from quote_engine.pricing import load_catalog
+
+ARTIFACT_CACHE_MB = float(os.environ.get("QUOTE_ARTIFACT_CACHE_MB", "200"))
+ARTIFACT_DIR = os.path.join(CACHE_DIR, "artifacts")
+ENGINE_DIR = os.path.dirname(os.path.abspath(__file__))
+
+_lock = threading.Lock()
+
+
+def _json_default(value):
+    if isinstance(value, (datetime.date, datetime.datetime)):
+        return value.isoformat()
+    if hasattr(value, "item"):  # numpy scalars
+        return value.item()
+    raise TypeError(f"Can't hash quote value of type {type(value).__name__}")
+
+
+def _stamps(root, suffixes):
+    # (relative path, mtime_ns, size) for matching files, in a stable order.
+    stamps = []
+    for dirpath, dirs, files in os.walk(root):
+        dirs.sort()
+        for name in sorted(files):
+            if name.lower().endswith(suffixes):
+                st = os.stat(os.path.join(dirpath, name))
+                stamps.append((os.path.relpath(os.path.join(dirpath, name), root), st.st_mtime_ns, st.st_size))
+    return stamps
+
+
+@functools.lru_cache(maxsize=1)
+def _engine_version():
+    # The code is imported once per process, so its files are stat'ed once.
+    return _sha256(_stamps(ENGINE_DIR, (".py",)))
+
+
+@functools.lru_cache(maxsize=1)
+def _assets_version(manifest):
+    # Content hashes of every image, per manifest snapshot (see get_manifest()).
+    return _sha256(sorted(
+        (os.path.relpath(info.path, manifest.root), info.sha256) for info in manifest.images.values()
+    ))
+
+
+def source_versions():
+    """
+    Versions of everything besides the quote that goes into a document:
+    the catalog and images by content hash, the DOCX template by stat stamp,
+    the engine code as loaded by this process.
+    """
+    from quote_engine.document import TEMPLATE_PATH
+
+    st = os.stat(resolve_path(TEMPLATE_PATH))
+    return {
+        "catalog": load_catalog().version,
+        "assets": _assets_version(get_manifest()),
+        "template": [st.st_mtime_ns, st.st_size],
+        "engine": _engine_version(),
+    }
+
+
+def _canonical(quote):
+    # Field order is irrelevant, but the order inside robot/gripper dicts is
+    # not (the first gripper picks the layout images), so only the top level
+    # is sorted.
+    return [[field, quote[field]] for field in sorted(quote)]
+
+
+def _sha256(payload):
+    text = json.dumps(payload, default=_json_default, separators=(",", ":"), ensure_ascii=False)
+    return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+
+def quote_fingerprint(quote):
+    """Content hash of the quote fields alone."""
+    return _sha256(_canonical(quote))
+
+
+def artifact_key(quote, **options):
+    """
+    Content hash of a quote plus source_versions(). `options` holds any
+    rendering switches that change the output (e.g. raster_table=True).
+    """
+    return _sha256({
+        "quote": _canonical(quote),
+        "options": sorted(options.items()),
+        "versions": source_versions(),
+    })
+
+
+def _entry_path(key, kind):
+    return os.path.join(ARTIFACT_DIR, f"{key}.{kind}")
+
+
+def get(key, kind):
+    """Cached bytes of a "docx" or "pptx" artifact, or None."""
+    if ARTIFACT_CACHE_MB <= 0:
+        return None
+    path = _entry_path(key, kind)
+    try:
+        with open(path, "rb") as f:
+            data = f.read()
+        os.utime(path)  # mark as recently used
+    except OSError:
+        return None
+    return data
+
+
+def put(key, kind, data):
+    """Store artifact bytes, then evict least recently used entries over the cap."""
+    if ARTIFACT_CACHE_MB <= 0:
+        return
+    path = cache_path("artifacts", f"{key}.{kind}")
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+    except OSError:
+        return
+    evict(keep=path)
+
+
+def evict(max_bytes=None, keep=None, directory=ARTIFACT_DIR):
+    """
+    Delete the least recently used (oldest mtime) files in `directory` until
+    it fits in `max_bytes`. Other file caches under CACHE_DIR use it too.
+    """
+    if max_bytes is None:
+        max_bytes = int(ARTIFACT_CACHE_MB * 1024 * 1024)
+    with _lock:
+        entries = []
+        try:
+            names = os.listdir(directory)
+        except OSError:
+            return
+        for name in names:
+            if name.endswith(".tmp"):
+                continue
+            path = os.path.join(directory, name)
+            try:
+                st = os.stat(path)
+            except OSError:
+                continue  # removed by another process
+            entries.append((st.st_mtime_ns, st.st_size, path))
+        total = sum(size for _, size, _ in entries)
+        for _, size, path in sorted(entries):
+            if total <= max_bytes:
+                break
+            if path == keep:
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
@@ -0,0 +1,141 @@
+'''
+Image asset lookup for quote documents.
+
+Resolves robot/gripper pictures and the Assets/<config_id> layout renders
+for a configuration. Existence checks go through the in-memory asset
+manifest (quote_engine.manifest) rather than the filesystem, and image
+bytes come from the content-addressed store (quote_engine.store).
+Long-running workers can preload() every image so documents are built from
+memory instead of re-reading files per quote.
+'''
+import os
+from collections import namedtuple
+
+from quote_engine import store
+from quote_engine.manifest import get_manifest
+from quote_engine.matching import nearest_config
+from quote_engine.paths import ASSETS_DIR, BASE_DIR, resolve_path
+
+ROBOT_DEFAULT = "robot_default.png"
+GRIPPER_DEFAULT = "gripper_default.png"
+
+GRIPPER_TYPES = ["VentuR", "BagR", "BagR CO", "PinchR Lr & M10", "MonstR", "DagR"]
+
+# Resolved images for one configuration. Paths are absolute.
+Layout = namedtuple(
+    "Layout",
+    "config_id assets_folder iso_path top_path front_path robot_images gripper_images",
+)
+
+
+def sanitize(s):
+    return (str(s).strip()
+            .lower()
+            .replace(" ", "_")
+            .replace("&", "and")
+            .replace(",", "")
+            .replace("-", "_")
+            .replace("/", ""))   # ✅ removes slashes
+
+
+def _image_base_name(name):
+    return name.lower().replace(" ", "_").replace("&", "and").replace(",", "").replace("-", "_")
+
+
+def robot_image(rtype):
+    """Picture of a robot arm model, falling back to robot_default.png."""
+    path = resolve_path(f"robot_{_image_base_name(rtype)}.png")
+    return path if get_manifest().exists(path) else resolve_path(ROBOT_DEFAULT)
+
+
+def gripper_image(gtype):
+    """Picture of a gripper model, falling back to gripper_default.png."""
+    path = resolve_path(f"gripper_{_image_base_name(gtype)}.png")
+    return path if get_manifest().exists(path) else resolve_path(GRIPPER_DEFAULT)
+
+
+def get_existing_config_folder(num_arms, robot_type_str, disposition_str, vrs_model_str, gripper_types_list, base_assets_path):
+    """
+    Try to find a config folder with the same layout but any available gripper type.
+    Returns the folder path and the gripper type used.
+    """
+    manifest = get_manifest()
+    for alt_gripper in gripper_types_list:
+        alt_gripper_str = sanitize(alt_gripper)
+        alt_config_id = f"{num_arms}arms_{robot_type_str}_{disposition_str}_{vrs_model_str}_{alt_gripper_str}"
+        if manifest.config(alt_config_id) is not None:
+            return os.path.join(base_assets_path, alt_config_id), alt_gripper
+    return base_assets_path, None  # fallback to root
+
+
+def resolve_layout(robot_type, gripper_type, disposition, vrs_model):
+    """
+    Find the images for a configuration.
+
+    Returns (Layout, notes) where notes is a list of (level, message) pairs
+    ("write", "info" or "warning") describing fallbacks for the UI to show.
+    """
+    notes = []
+    manifest = get_manifest()
+    num_arms = sum(robot_type.values()) if robot_type else 0
+
+    robot_type_str = "_".join([sanitize(rt) for rt in robot_type.keys()]) if isinstance(robot_type, dict) else sanitize(robot_type)
+    disposition_str = sanitize(disposition)
+    vrs_model_str = sanitize(vrs_model)
+
+    # Only use the first gripper type for config_id and images
+    if isinstance(gripper_type, dict) and gripper_type:
+        first_gripper = next(iter(gripper_type.keys()))
+        gripper_type_str = sanitize(first_gripper)
+    else:
+        gripper_type_str = sanitize(gripper_type)
+
+    config_id = f"{num_arms}arms_{robot_type_str}_{disposition_str}_{vrs_model_str}_{gripper_type_str}"
+
+    base_assets_path = os.path.join(BASE_DIR, ASSETS_DIR)
+    assets_folder = os.path.join(base_assets_path, config_id)
+
+    notes.append(("write", f"🔍 Looking for config folder: {assets_folder}"))
+
+    if manifest.config(config_id) is None:
+        notes.append(("warning", f"⚠️ Config folder '{config_id}' not found, searching for alternate gripper images."))
+        # Try to find another gripper type with the same layout
+        alt_folder, alt_gripper = get_existing_config_folder(
+            num_arms, robot_type_str, disposition_str, vrs_model_str, GRIPPER_TYPES, base_assets_path
+        )
+        if alt_folder != base_assets_path:
+            notes.append(("info", f"Using images from configuration with gripper '{alt_gripper}'."))
+            assets_folder = alt_folder
+        else:
+            # Otherwise the closest configuration we have renders for
+            match, score = nearest_config(num_arms, robot_type_str, disposition_str, vrs_model_str, gripper_type_str)
+            if match is not None:
+                notes.append(("info", f"Using images from closest configuration '{match.config_id}' (match {score:.0%})."))
+                assets_folder = match.folder
+            else:
+                notes.append(("warning", "No alternate configuration images found, using default images."))
+                assets_folder = base_assets_path  # fallback to root
+
+    views = {}
+    for view in ("iso", "top", "front"):
+        path = os.path.join(assets_folder, f"{view}.png")
+        if not manifest.exists(path):
+            notes.append(("warning", f"⚠️ Missing {view}.png for {config_id}, using default."))
+            path = resolve_path(ROBOT_DEFAULT)
+        views[view] = path
+
+    layout = Layout(
+        config_id=config_id,
+        assets_folder=assets_folder,
+        iso_path=views["iso"],
+        top_path=views["top"],
+        front_path=views["front"],
+        robot_images=[robot_image(rtype) for rtype in (robot_type or {})],
+        gripper_images=[gripper_image(gtype) for gtype in (gripper_type or {})],
+    )
+    return layout, notes
+
+
+def preload():
+    """Read every unique image in the asset manifest into memory."""
+    store.preload()
@@ -0,0 +1,154 @@
+'''
+Headless batch quote generator.
+
+    python -m quote_engine.batch requests.jsonl --out quotes/
+
+Each input line is a JSON object holding the fields the five form tabs
+collect (see quote_engine.quote.DEFAULT_FIELDS), plus an optional "id" used
+to name the output files. Every valid line produces a DOCX and a PPTX.
+
+Lines are streamed and rendered by a pool of worker processes that load the
+DOCX template, the deck template and all images once at startup; at most
+--max-pending lines are in flight at a time, so memory stays bounded however
+long the file is. Finished lines are appended to <out>/journal.jsonl, and a
+re-run skips every line already recorded there as done.
+'''
+import argparse
+import json
+import os
+import re
+import sys
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from quote_engine import assets, document, slides
+from quote_engine.api import price_quote, render_docx, render_pptx, resolve_quote_layout, validate
+from quote_engine.quote import output_basename
+
+JOURNAL_NAME = "journal.jsonl"
+
+
+def _init_worker():
+    assets.preload()
+    document.preload_template()
+    slides.preload_template()
+
+
+def _safe_name(name):
+    return re.sub(r"[^\w.-]+", "_", str(name)).strip("_") or "quote"
+
+
+def _save(data, path):
+    # Write next to the target and rename, so a crash never leaves a
+    # truncated file under the final name.
+    tmp = f"{path}.part"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+
+
+def render_request(line_no, text, out_dir):
+    """Render one JSONL line; returns its journal entry."""
+    try:
+        data = json.loads(text)
+        request_id = data.pop("id", None)
+        quote = validate(data)
+        priced = price_quote(quote)
+        layout, _notes = resolve_quote_layout(quote)
+        stem = os.path.join(out_dir, f"{line_no:06d}_{_safe_name(request_id or output_basename(quote))}")
+
+        docx_path = f"{stem}.docx"
+        _save(render_docx(quote, priced, layout), docx_path)
+        pptx_path = f"{stem}.pptx"
+        _save(render_pptx(quote, priced, layout), pptx_path)
+    except Exception as e:
+        return {"line": line_no, "status": "error", "error": f"{type(e).__name__}: {e}"}
+    return {
+        "line": line_no,
+        "status": "ok",
+        "id": request_id,
+        "total": priced.total,
+        "currency": quote["currency"],
+        "docx": docx_path,
+        "pptx": pptx_path,
+    }
+
+
+def completed_lines(journal_path):
+    """Line numbers already rendered successfully according to the journal."""
+    done = set()
+    if not os.path.exists(journal_path):
+        return done
+    with open(journal_path, encoding="utf-8") as f:
+        for text in f:
+            try:
+                entry = json.loads(text)
+            except json.JSONDecodeError:
+                continue  # torn last line after a crash
+            if entry.get("status") == "ok":
+                done.add(entry["line"])
+    return done
+
+
+def run(input_path, out_dir, workers=None, max_pending=None, restart=False, log=sys.stderr):
+    """Render every pending line of `input_path`; returns (ok, failed) counts."""
+    os.makedirs(out_dir, exist_ok=True)
+    journal_path = os.path.join(out_dir, JOURNAL_NAME)
+    if restart and os.path.exists(journal_path):
+        os.remove(journal_path)
+    done = completed_lines(journal_path)
+    workers = workers or os.cpu_count() or 1
+    max_pending = max_pending or 2 * workers
+    counts = {"ok": 0, "error": 0}
+    skipped = 0
+
+    with open(journal_path, "a", encoding="utf-8") as journal:
+
+        def record(futures):
+            for future in futures:
+                entry = future.result()
+                journal.write(json.dumps(entry) + "\n")
+                journal.flush()
+                os.fsync(journal.fileno())
+                counts[entry["status"]] += 1
+                if entry["status"] == "ok":
+                    print(f"line {entry['line']}: {entry['docx']}, {entry['pptx']}", file=log)
+                else:
+                    print(f"line {entry['line']}: {entry['error']}", file=log)
+
+        with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker) as pool, \
+                open(input_path, encoding="utf-8") as requests:
+            pending = set()
+            for line_no, text in enumerate(requests, 1):
+                if not text.strip():
+                    continue
+                if line_no in done:
+                    skipped += 1
+                    continue
+                if len(pending) >= max_pending:
+                    finished, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    record(finished)
+                pending.add(pool.submit(render_request, line_no, text, out_dir))
+            record(wait(pending).done)
+
+    if skipped:
+        print(f"skipped {skipped} line(s) already done", file=log)
+    return counts["ok"], counts["error"]
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Generate DOCX/PPTX quotes from a JSONL request file.")
+    parser.add_argument("requests", help="JSONL file, one quote request per line")
+    parser.add_argument("--out", default="quotes_out", help="output directory (default: quotes_out)")
+    parser.add_argument("--workers", type=int, default=None, help="worker processes (default: all cores)")
+    parser.add_argument("--max-pending", type=int, default=None,
+                        help="lines in flight at once (default: 2 x workers)")
+    parser.add_argument("--restart", action="store_true", help="ignore the journal and render every line")
+    args = parser.parse_args(argv)
+
+    ok, failed = run(args.requests, args.out, args.workers, args.max_pending, args.restart)
+    print(f"{ok} quote(s) generated, {failed} failed", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,83 @@
+'''
+Vectorized pricing for many configurations at once.
+
+A batch is a quantity matrix: one row per configuration, one column per SKU
+from pricing.csv. Line items are the quantities scaled by the unit price
+vector, totals are a single matrix-vector product, and the currency
+multiplier is applied per row.
+'''
+from collections import namedtuple
+
+import numpy as np
+import pandas as pd
+
+from quote_engine.pricing import load_catalog, select_options
+
+BatchPrices = namedtuple("BatchPrices", "line_items totals")
+
+
+def catalog_skus(catalog=None):
+    """SKU column order used for NumPy quantity matrices (pricing.csv order)."""
+    if catalog is None:
+        catalog = load_catalog()
+    return list(catalog.prices)
+
+
+def quantity_matrix(configs, catalog=None):
+    """
+    Build a quantity DataFrame from a list of form `inputs` dicts, using the
+    same option-to-SKU mapping as calculate_price_breakdown.
+    """
+    if catalog is None:
+        catalog = load_catalog()
+    skus = catalog_skus(catalog)
+    column = {sku: i for i, sku in enumerate(skus)}
+    quantities = np.zeros((len(configs), len(skus)))
+    for row, inputs in enumerate(configs):
+        for ui_key, value, qty in select_options(inputs):
+            entry = catalog.lookup(ui_key, value)
+            if entry is not None and entry.sku in column:
+                quantities[row, column[entry.sku]] += qty
+    return pd.DataFrame(quantities, columns=skus)
+
+
+def price_batch(configs, multipliers=1.0, catalog=None):
+    """
+    Price a batch of configurations.
+
+    `configs` is either a DataFrame whose columns are SKUs from pricing.csv
+    (missing SKUs count as zero) or a 2-D NumPy array whose columns follow
+    catalog_skus(). `multipliers` is a scalar or one currency multiplier per
+    row. Returns BatchPrices(line_items, totals) as DataFrame/Series for a
+    DataFrame input and as arrays for an array input.
+    """
+    if catalog is None:
+        catalog = load_catalog()
+    skus = catalog_skus(catalog)
+
+    if isinstance(configs, pd.DataFrame):
+        unknown = [sku for sku in configs.columns if sku not in catalog.prices]
+        if unknown:
+            raise ValueError(f"Unknown SKUs in batch: {', '.join(map(str, unknown))}")
+        index = configs.index
+        quantities = configs.reindex(columns=skus, fill_value=0).to_numpy(dtype=float)
+    else:
+        index = None
+        quantities = np.asarray(configs, dtype=float)
+        if quantities.ndim != 2 or quantities.shape[1] != len(skus):
+            raise ValueError(
+                f"Expected a (configurations, {len(skus)}) quantity matrix, got shape {quantities.shape}"
+            )
+
+    unit_prices = np.fromiter((catalog.prices[sku] for sku in skus), dtype=float, count=len(skus))
+    multipliers = np.broadcast_to(np.asarray(multipliers, dtype=float), (quantities.shape[0],))
+
+    totals = (quantities @ unit_prices) * multipliers
+    line_items = quantities * unit_prices * multipliers[:, None]
+
+    if index is None:
+        return BatchPrices(line_items, totals)
+    return BatchPrices(
+        pd.DataFrame(line_items, index=index, columns=skus),
+        pd.Series(totals, index=index, name="Total"),
+    )
@@ -0,0 +1,182 @@
+'''
+Packed asset bundle.
+
+    python -m quote_engine.bundle [--warm requests.jsonl] [--out PATH]
+
+packs every unique image from the asset manifest, plus every pre-sized
+derivative in the image cache, into one file. It also records each source
+file's stat stamp, pixel size and sha256. Run it as a build step (e.g. in the
+container image); --warm first renders the quotes in a batch request file so
+the derivatives those documents need are included.
+
+At runtime the bundle is memory-mapped. The manifest takes metadata of
+unchanged files from it instead of reading and hashing them, and the asset
+store and derivative cache serve bytes from it, so a cold process does one
+mmap instead of opening every image.
+
+Layout: MAGIC, an 8-byte little-endian index length, the JSON index, then
+the data. The index maps sha256 -> [offset, length] ("blobs"), derivative
+key -> [offset, length] ("derivatives") and repo-relative path -> [mtime_ns,
+size, sha256, width, height, dpi] ("files"). Offsets are from the data start.
+'''
+import argparse
+import json
+import mmap
+import os
+import struct
+import sys
+import tempfile
+import threading
+
+from quote_engine.paths import BASE_DIR, CACHE_DIR
+
+BUNDLE_PATH = os.environ.get("QUOTE_ASSET_BUNDLE") or os.path.join(CACHE_DIR, "assets.bundle")
+MAGIC = b"WRQBNDL1"
+_HEADER = struct.Struct("<8sQ")
+
+_bundle = None  # ((mtime_ns, size), AssetBundle or None)
+_lock = threading.Lock()
+
+
+def relative_name(path, root=BASE_DIR):
+    return os.path.relpath(path, root).replace(os.sep, "/")
+
+
+class AssetBundle:
+    """Read-only view of a bundle file."""
+
+    def __init__(self, path):
+        self.path = path
+        with open(path, "rb") as f:
+            self._map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        magic, index_length = _HEADER.unpack_from(self._map, 0)
+        if magic != MAGIC:
+            raise ValueError(f"{path} is not an asset bundle")
+        start = _HEADER.size
+        index = json.loads(self._map[start:start + index_length].decode("utf-8"))
+        self._data_start = start + index_length
+        self.blobs = index["blobs"]
+        self.derivatives = index["derivatives"]
+        self.files = index["files"]
+
+    def _slice(self, span):
+        offset, length = span
+        start = self._data_start + offset
+        return self._map[start:start + length]
+
+    def blob(self, sha256):
+        span = self.blobs.get(sha256)
+        return None if span is None else self._slice(span)
+
+    def derivative(self, key):
+        span = self.derivatives.get(key)
+        return None if span is None else self._slice(span)
+
+    def file_info(self, name, stamp):
+        """(sha256, width, height, dpi) for a repo-relative file if its stamp still matches."""
+        entry = self.files.get(name)
+        if entry is None or (entry[0], entry[1]) != stamp:
+            return None
+        sha256, width, height, dpi = entry[2:]
+        return sha256, width, height, tuple(dpi) if dpi else dpi
+
+
+def get_bundle(path=None):
+    """The bundle at `path` (default BUNDLE_PATH), or None if there isn't a usable one."""
+    global _bundle
+    path = path or BUNDLE_PATH
+    try:
+        st = os.stat(path)
+    except OSError:
+        return None
+    stamp = (path, st.st_mtime_ns, st.st_size)
+    cached = _bundle
+    if cached is None or cached[0] != stamp:
+        with _lock:
+            cached = _bundle
+            if cached is None or cached[0] != stamp:
+                try:
+                    bundle = AssetBundle(path)
+                except (OSError, ValueError):
+                    bundle = None
+                cached = _bundle = (stamp, bundle)
+    return cached[1]
+
+
+def _warm(requests_path):
+    # Render every quote once so the derivatives they need are in the cache.
+    from quote_engine.batch import render_request
+
+    with tempfile.TemporaryDirectory() as out_dir, open(requests_path, encoding="utf-8") as requests:
+        for line_no, text in enumerate(requests, 1):
+            if text.strip():
+                entry = render_request(line_no, text, out_dir)
+                if entry["status"] != "ok":
+                    print(f"warm line {line_no}: {entry['error']}", file=sys.stderr)
+
+
+def build(out_path=None, warm=None):
+    """Write a bundle of the current assets; returns (path, unique images, derivatives)."""
+    from quote_engine import store
+    from quote_engine.images import IMAGE_DIR
+    from quote_engine.manifest import AssetManifest
+
+    if warm:
+        _warm(warm)
+    out_path = out_path or BUNDLE_PATH
+    manifest = AssetManifest()
+
+    chunks = []
+    offset = 0
+    blobs, derivatives, files = {}, {}, {}
+
+    def add(data):
+        nonlocal offset
+        chunks.append(data)
+        span = [offset, len(data)]
+        offset += len(data)
+        return span
+
+    for info in manifest.images.values():
+        st = os.stat(info.path)
+        files[relative_name(info.path, manifest.root)] = [
+            st.st_mtime_ns, st.st_size, info.sha256, info.width, info.height, info.dpi,
+        ]
+        if info.sha256 not in blobs:
+            blobs[info.sha256] = add(store.read(info.path))
+
+    # Derivative keys start with the first 32 hex digits of their source digest.
+    prefixes = {sha256[:32] for sha256 in blobs}
+    if os.path.isdir(IMAGE_DIR):
+        for name in sorted(os.listdir(IMAGE_DIR)):
+            if name.endswith(".tmp") or name.split("_", 1)[0] not in prefixes:
+                continue
+            with open(os.path.join(IMAGE_DIR, name), "rb") as f:
+                derivatives[name] = add(f.read())
+
+    index = json.dumps({"blobs": blobs, "derivatives": derivatives, "files": files}).encode("utf-8")
+    os.makedirs(os.path.dirname(os.path.abspath(out_path)), exist_ok=True)
+    tmp = f"{out_path}.{os.getpid()}.tmp"
+    with open(tmp, "wb") as f:
+        f.write(_HEADER.pack(MAGIC, len(index)))
+        f.write(index)
+        for data in chunks:
+            f.write(data)
+    os.replace(tmp, out_path)
+    return out_path, len(blobs), len(derivatives)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description="Pack image assets and their derivatives into one bundle file.")
+    parser.add_argument("--out", default=None, help=f"bundle path (default: {BUNDLE_PATH})")
+    parser.add_argument("--warm", default=None, metavar="JSONL",
+                        help="render these batch requests first so their image derivatives are packed")
+    args = parser.parse_args(argv)
+
+    path, images, derivatives = build(args.out, args.warm)
+    print(f"{path}: {images} image(s), {derivatives} derivative(s), {os.path.getsize(path):,} bytes", file=sys.stderr)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
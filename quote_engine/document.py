@@ -0,0 +1,159 @@
+'''
+Word (DOCX) quote rendered from template_practice.docx.
+
+The template package is parsed once per process and shared by every
+session; each render works on its own deep copy of it.
+'''
+import copy
+import os
+import threading
+from io import BytesIO
+
+from docx import Document
+from docx.shared import Mm
+from docxtpl import DocxTemplate, InlineImage
+
+from quote_engine import tracing
+from quote_engine.assets import GRIPPER_DEFAULT, ROBOT_DEFAULT
+from quote_engine.images import sized_image
+from quote_engine.paths import resolve_path
+from quote_engine.price_table import add_docx_price_table, save_df_as_image
+
+TEMPLATE_PATH = "template_practice.docx"
+
+# The price breakdown is a native Word table; set QUOTE_RASTER_PRICE_TABLE=1
+# to embed the old matplotlib image instead.
+RASTER_PRICE_TABLE = os.environ.get("QUOTE_RASTER_PRICE_TABLE", "") not in ("", "0")
+# Rendered into {{ price_table_img }}, then swapped for the table.
+PRICE_TABLE_MARKER = "@@price_table@@"
+
+# ((mtime_ns, size), parsed Document) of the template. Never rendered into.
+_template = None
+_template_lock = threading.Lock()
+
+
+def _template_document(path):
+    global _template
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _template
+    if cached is None or cached[0] != stamp:
+        with _template_lock:
+            cached = _template
+            if cached is None or cached[0] != stamp:
+                cached = _template = (stamp, Document(path))
+    return cached[1]
+
+
+def preload_template():
+    """Parse the template now rather than on the first render."""
+    _template_document(resolve_path(TEMPLATE_PATH))
+
+
+def load_template():
+    """
+    Return a DocxTemplate ready to render, cloned from the cached template.
+    The template is re-parsed only when the file changes on disk.
+    """
+    path = resolve_path(TEMPLATE_PATH)
+    tpl = DocxTemplate(path)
+    # Media blobs are immutable bytes, so the copy shares them with the cache.
+    tpl.docx = copy.deepcopy(_template_document(path))
+    return tpl
+
+
+def _inline(doc, path, width, height):
+    return InlineImage(doc, sized_image(path, width, height), width=width, height=height)
+
+
+def _replace_marker_with_table(doc, df, currency):
+    for paragraph in doc.paragraphs:
+        if PRICE_TABLE_MARKER in paragraph.text:
+            add_docx_price_table(doc, paragraph, df, currency=currency, width=Mm(160))
+            return
+
+
+def build_docx(quote, layout, df, total, raster_table=None, table_image=None):
+    """
+    Render the DOCX quote. `df` is the price breakdown and `total` its sum,
+    both already converted to the quote currency. `raster_table` picks the
+    image price table over the native one (default: RASTER_PRICE_TABLE);
+    `table_image` is that PNG if it was already rendered.
+    """
+    if raster_table is None:
+        raster_table = RASTER_PRICE_TABLE
+    with tracing.span("docx.template"):
+        doc = load_template()
+    currency = quote["currency"]
+    robot_type = quote["robot_type"]
+    robot_bases = quote["robot_bases"]
+    gripper_type = quote["gripper_type"]
+
+    with tracing.span("docx.images"):
+        # Robot Arm Images (one per selected type)
+        robot_arm_images = [
+            _inline(doc, path, width=Mm(100), height=Mm(80))
+            for path in (layout.robot_images or [ROBOT_DEFAULT])
+        ]
+
+        layout_image = _inline(doc, layout.iso_path, width=Mm(100), height=Mm(80))
+        layout_overview_top = _inline(doc, layout.top_path, width=Mm(150), height=Mm(80))
+        layout_overview_front = _inline(doc, layout.front_path, width=Mm(150), height=Mm(80))
+
+        gripper_images = [
+            _inline(doc, path, width=Mm(100), height=Mm(80))
+            for path in (layout.gripper_images or [GRIPPER_DEFAULT])
+        ]
+
+    if raster_table:
+        if table_image is None:
+            table_image = save_df_as_image(df, currency=currency)
+        elif isinstance(table_image, bytes):
+            table_image = BytesIO(table_image)
+        price_table_img = InlineImage(doc, table_image, width=Mm(160))
+    else:
+        price_table_img = PRICE_TABLE_MARKER
+
+    context = {
+        "value_proposition": quote["value_proposition"],
+        "application_overview": quote["application_overview"],
+        "client_name": quote["client_name"],
+        "client_company": quote["client_company"],
+        "quote_date": quote["quote_date"].strftime("%B %d, %Y"),
+        "site_location": quote["site_location"],
+        "robot_type": robot_type,
+        "robot_arms": sum(robot_type.values()) if robot_type else 0,
+        "robot_bases": sum(robot_bases.values()) if isinstance(robot_bases, dict) else robot_bases,
+        "gripper_type": ", ".join(gripper_type),
+        "vision_system": ", ".join(quote["vision_system"]),
+        "materials": ", ".join(quote["materials"]),
+        "belt_speed": quote["belt_speed"],
+        "pick_rate": quote["pick_rate"],
+        "max_object_weight": quote["max_object_weight"],
+        "input_power_kva": quote["input_power_kva"],
+        "avg_consumption_kw": quote["avg_consumption_kw"],
+        "air_consumption_lpm": quote["air_consumption_lpm"],
+        "total_price": f"{currency} {total:,.0f}",
+        "warranty_option": quote["warranty_option"],
+        "safety_fencing": quote["safety_fencing"],
+        "try_and_buy": quote["try_and_buy"],
+        "layout_image": layout_image,
+        "gripper_images": gripper_images,
+        "robot_arm_images": robot_arm_images,
+        "order_confirmation_project_kickoff": quote["order_confirmation_project_kickoff"],
+        "detailed_engineering": quote["detailed_engineering"],
+        "engineering_review": quote["engineering_review"],
+        "procurement_fabrication": quote["procurement_fabrication"],
+        "fat_shipping": quote["fat_shipping"],
+        "retrofit_installation": quote["retrofit_installation"],
+        "commissioning_and_SAT": quote["commissioning_and_SAT"],
+        "price_table_img": price_table_img,
+        "layout_overview_top": layout_overview_top,
+        "layout_overview_front": layout_overview_front,
+    }
+
+    with tracing.span("docx.render"):
+        doc.render(context)
+        if not raster_table:
+            _replace_marker_with_table(doc, df, currency)
+    return doc
@@ -0,0 +1,144 @@
+'''
+Concurrent document generation.
+
+The DOCX and the PPTX only share their inputs, so generate_documents() builds
+them as parallel tasks on a shared pool instead of one after the other. When
+the raster price table is enabled it is a third task, run alongside the PPTX
+and handed to the DOCX when done.
+
+The pool is a thread pool by default, which is safe inside the Streamlit
+server. QUOTE_GENERATION_POOL=process switches to worker processes (with the
+template and images preloaded) so the builds also run in parallel on
+several cores.
+
+Each task and its steps are timed as quote_engine.tracing spans ("docx",
+"docx.render", "pptx.slide.<name>", "pptx.save", ...).
+'''
+import os
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, ThreadPoolExecutor, wait
+
+from quote_engine import assets, document, slides, tracing
+from quote_engine.document import RASTER_PRICE_TABLE, build_docx
+from quote_engine.output import document_bytes
+from quote_engine.price_table import save_df_as_image
+from quote_engine.slides import build_presentation
+
+GENERATION_POOL = os.environ.get("QUOTE_GENERATION_POOL", "thread")
+GENERATION_WORKERS = int(os.environ.get("QUOTE_GENERATION_WORKERS", "0")) or min(4, (os.cpu_count() or 1) + 1)
+
+TASK_LABELS = {
+    "table": "Price table image",
+    "docx": "Word document",
+    "pptx": "PowerPoint deck",
+    "save": "Saving documents",
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+def _init_worker():
+    assets.preload()
+    document.preload_template()
+    slides.preload_template()
+
+
+def executor():
+    """The process-wide generation pool, created on first use."""
+    global _pool
+    if _pool is None:
+        with _pool_lock:
+            if _pool is None:
+                if GENERATION_POOL == "process":
+                    _pool = ProcessPoolExecutor(max_workers=GENERATION_WORKERS, initializer=_init_worker)
+                else:
+                    _pool = ThreadPoolExecutor(max_workers=GENERATION_WORKERS, thread_name_prefix="quote-gen")
+    return _pool
+
+
+def render_table(df, currency):
+    return save_df_as_image(df, currency=currency).getvalue()
+
+
+def render_docx(quote, layout, df, total, raster_table, table_image=None):
+    with tracing.span("docx") as sp:
+        doc = build_docx(quote, layout, df, total, raster_table=raster_table, table_image=table_image)
+        with tracing.span("docx.save") as save:
+            data = document_bytes(doc)
+            save.bytes = sp.bytes = len(data)
+    return data
+
+
+def render_pptx(quote, layout, total, multiplier, on_slide=None, df=None):
+    with tracing.span("pptx") as sp:
+        prs = build_presentation(quote, layout, total, multiplier, df=df, on_slide=on_slide)
+        with tracing.span("pptx.save") as save:
+            data = document_bytes(prs)
+            save.bytes = sp.bytes = len(data)
+    return data
+
+
+def generate_documents(quote, layout, df, total, multiplier, kinds=("docx", "pptx"), raster_table=None, progress=None,
+                       on_slide=None):
+    """
+    Build the requested documents concurrently; returns {kind: bytes}.
+
+    `progress(task, state, seconds, fraction)` is called from the calling
+    thread as each task ("table", "docx", "pptx") is "running", "done" or
+    "failed"; `seconds` is the task's wall time so far and `fraction` the
+    share of all planned tasks that are done.
+
+    `on_slide(done, count)` is passed to build_presentation(), so unlike
+    `progress` it is called from the pool's worker thread. Callbacks can't
+    reach a worker process, so the process pool ignores it.
+    """
+    if raster_table is None:
+        raster_table = RASTER_PRICE_TABLE
+    planned = len(kinds) + (1 if raster_table and "docx" in kinds else 0)
+    results = {}
+
+    def report(task, state, seconds):
+        if progress is not None:
+            progress(task, state, seconds, len(results) / planned)
+
+    pool = executor()
+    futures = {}
+    started = {}
+
+    def submit(task, fn, *args):
+        started[task] = time.perf_counter()
+        if GENERATION_POOL != "process":
+            fn = tracing.bind(fn)  # keep the caller's trace in the pool thread
+        futures[pool.submit(fn, *args)] = task
+        report(task, "running", 0.0)
+
+    if "pptx" in kinds:
+        if GENERATION_POOL == "process":
+            on_slide = None
+        # The deck gets the native breakdown table unless the raster table was chosen.
+        submit("pptx", render_pptx, quote, layout, total, multiplier, on_slide, None if raster_table else df)
+    if "docx" in kinds:
+        if raster_table:
+            submit("table", render_table, df, quote["currency"])
+        else:
+            submit("docx", render_docx, quote, layout, df, total, False)
+
+    try:
+        while futures:
+            done, _ = wait(futures, return_when=FIRST_COMPLETED)
+            for future in done:
+                task = futures.pop(future)
+                try:
+                    results[task] = future.result()
+                except Exception:
+                    report(task, "failed", time.perf_counter() - started[task])
+                    raise
+                report(task, "done", time.perf_counter() - started[task])
+                if task == "table":
+                    submit("docx", render_docx, quote, layout, df, total, True, results["table"])
+    finally:
+        for future in futures:
+            future.cancel()
+    return {kind: results[kind] for kind in kinds}
@@ -0,0 +1,148 @@
+'''
+Pre-sized image derivatives for DOCX/PPTX embedding.
+
+Documents show pictures at a few inches wide, but the source PNGs are often
+several times that resolution. sized_image() returns a copy resampled to the
+display size at DERIVATIVE_DPI, cached on disk under CACHE_DIR/images and in
+memory, keyed by the source's content hash and the target pixel size, so
+byte-identical sources share one derivative (and one media part per
+document). Derivatives packed into the asset bundle are served from it.
+Both caches are bounded: the QUOTE_IMAGE_CACHE_ENTRIES most recently used
+derivatives in memory and QUOTE_IMAGE_CACHE_MB on disk.
+'''
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+from PIL import Image as PILImage
+
+from quote_engine import store
+from quote_engine.artifacts import evict
+from quote_engine.bundle import get_bundle
+from quote_engine.paths import CACHE_DIR, cache_path
+
+DERIVATIVE_DPI = 200
+EMU_PER_INCH = 914400
+JPEG_QUALITY = 90
+IMAGE_CACHE_ENTRIES = int(os.environ.get("QUOTE_IMAGE_CACHE_ENTRIES", "128"))
+IMAGE_CACHE_MB = float(os.environ.get("QUOTE_IMAGE_CACHE_MB", "100"))
+IMAGE_DIR = os.path.join(CACHE_DIR, "images")
+
+# derivative key -> encoded bytes, least recently used first
+_derivatives = OrderedDict()
+# derivative key -> lock held while it is being built, so concurrent
+# DOCX/PPTX builds wait for one resize instead of each doing their own.
+_building = {}
+_lock = threading.Lock()
+
+
+def source_digest(path):
+    """sha256 of an image file (see quote_engine.store)."""
+    return store.digest(path)
+
+
+def _target_size(img_size, width, height, dpi):
+    """Pixel size for a display box in EMU; either side may be None."""
+    img_w, img_h = img_size
+    if width is not None and height is not None:
+        target = (width * dpi / EMU_PER_INCH, height * dpi / EMU_PER_INCH)
+    elif width is not None:
+        w = width * dpi / EMU_PER_INCH
+        target = (w, w * img_h / img_w)
+    else:
+        h = height * dpi / EMU_PER_INCH
+        target = (h * img_w / img_h, h)
+    # Never upscale: a smaller source is already as small as it gets.
+    return (max(1, min(img_w, round(target[0]))), max(1, min(img_h, round(target[1]))))
+
+
+def _is_opaque(img):
+    if img.mode in ("RGB", "L"):
+        return True
+    if img.mode == "RGBA":
+        return img.getchannel("A").getextrema()[0] == 255
+    return False
+
+
+def _encode(img, dpi):
+    # Renders and photos with no transparency compress far better as JPEG;
+    # anything with an alpha channel stays PNG.
+    out = BytesIO()
+    if _is_opaque(img):
+        img.convert("RGB").save(out, format="JPEG", quality=JPEG_QUALITY, optimize=True, dpi=(dpi, dpi))
+    else:
+        img.save(out, format="PNG", dpi=(dpi, dpi))
+    return out.getvalue()
+
+
+def _build_derivative(path, width, height, dpi):
+    data = store.read(path)
+    with PILImage.open(BytesIO(data)) as img:
+        size = _target_size(img.size, width, height, dpi)
+        img = img.convert("RGBA") if img.mode in ("P", "LA") else img
+        if size == img.size:
+            # Already small enough; only keep a re-encode that actually helps.
+            encoded = _encode(img, dpi)
+            return encoded if len(encoded) < len(data) else data
+        return _encode(img.resize(size, PILImage.LANCZOS), dpi)
+
+
+def _cached(key):
+    with _lock:
+        data = _derivatives.get(key)
+        if data is not None:
+            _derivatives.move_to_end(key)
+        return data
+
+
+def _load_or_build(key, path, width, height, dpi):
+    bundle = get_bundle()
+    data = bundle.derivative(key) if bundle is not None else None
+    if data is not None:
+        return data
+    disk_path = cache_path("images", key)
+    try:
+        with open(disk_path, "rb") as f:
+            data = f.read()
+        os.utime(disk_path)  # mark as recently used
+        return data
+    except OSError:
+        pass
+    data = _build_derivative(path, width, height, dpi)
+    try:
+        tmp = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, disk_path)
+    except OSError:
+        pass
+    else:
+        evict(int(IMAGE_CACHE_MB * 1024 * 1024), keep=disk_path, directory=IMAGE_DIR)
+    return data
+
+
+def sized_image(path, width=None, height=None, dpi=DERIVATIVE_DPI):
+    """
+    Return an in-memory image for embedding `path` at `width` x `height`
+    (EMU lengths such as Mm(100) or Inches(3); give at least one).
+    Sources are never upscaled.
+    """
+    digest = source_digest(path)
+    w = "auto" if width is None else int(width)
+    h = "auto" if height is None else int(height)
+    key = f"{digest[:32]}_{w}x{h}_{dpi}"
+    data = _cached(key)
+    if data is None:
+        with _lock:
+            key_lock = _building.setdefault(key, threading.Lock())
+        with key_lock:
+            data = _cached(key)
+            if data is None:
+                data = _load_or_build(key, path, width, height, dpi)
+                with _lock:
+                    _derivatives[key] = data
+                    while len(_derivatives) > IMAGE_CACHE_ENTRIES:
+                        _derivatives.popitem(last=False)
+                    _building.pop(key, None)
+    return BytesIO(data)
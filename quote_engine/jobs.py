@@ -0,0 +1,217 @@
+'''
+Background quote generation.
+
+submit() validates a quote, queues it and returns a job id right away. A
+pool of QUOTE_JOB_WORKERS threads prices each job, resolves its images and
+generates both documents, recording per-stage progress (pricing, layout
+images, price table image, DOCX, each PPTX slide, save) that the page polls
+with get(). Finished jobs keep their documents for the page to collect
+until forget(), or until nobody has polled them for QUOTE_JOB_RESULT_TTL
+seconds.
+
+At most QUOTE_JOB_WORKERS + QUOTE_JOB_QUEUE_DEPTH jobs are held at once,
+running, queued or finished but not yet collected, so neither a burst of
+requests nor abandoned results pile up builds and their bytes in memory.
+To make room, submit() drops the oldest results that have gone
+QUOTE_JOB_POLL_GRACE seconds without a get(), i.e. whose page has gone
+away; a result a page is still polling for is never dropped, and submit()
+raises JobQueueFull instead.
+'''
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+from quote_engine import api, tracing
+
+JOB_WORKERS = int(os.environ.get("QUOTE_JOB_WORKERS", "2"))
+JOB_QUEUE_DEPTH = int(os.environ.get("QUOTE_JOB_QUEUE_DEPTH", "8"))
+JOB_RESULT_TTL = float(os.environ.get("QUOTE_JOB_RESULT_TTL", "120"))
+JOB_POLL_GRACE = float(os.environ.get("QUOTE_JOB_POLL_GRACE", "10"))
+
+# Share of a job's progress bar per stage, roughly by time taken. The deck
+# moves one step per slide as its slides are built.
+STAGE_WEIGHTS = {"pricing": 1, "layout": 1, "table": 2, "docx": 3, "pptx": 8, "save": 1}
+
+_jobs = {}  # job id -> Job
+_lock = threading.Lock()
+_pool = None
+
+
+class JobQueueFull(RuntimeError):
+    """QUOTE_JOB_WORKERS + QUOTE_JOB_QUEUE_DEPTH jobs are already pending."""
+
+
+class Job:
+    """
+    One queued quote. `state` is "queued", "running", "done" or "failed";
+    `message` and `fraction` describe the current stage. Once done,
+    `priced`, `notes` and `documents` hold what api.price_quote(),
+    api.resolve_quote_layout() and api.generate_quote() returned; a failed
+    job has the exception in `error`. Only the worker updates a job, apart
+    from `polled` (the last get()) and `forgotten`, which forget() sets.
+    """
+
+    def __init__(self, quote):
+        self.id = uuid.uuid4().hex
+        self.quote = quote
+        self.state = "queued"
+        self.message = "Waiting for a free worker"
+        self.fraction = 0.0
+        self.submitted = self.polled = time.time()
+        self.finished = None
+        self.priced = self.notes = self.documents = self.error = None
+        self.forgotten = False
+        self._done = {}  # stage -> fraction done
+        self._lock = threading.Lock()
+
+    @property
+    def pending(self):
+        return self.state in ("queued", "running")
+
+    def _start(self, stages):
+        with self._lock:
+            self.state = "running"
+            self._done = dict.fromkeys(stages, 0.0)
+
+    def _progress(self, stage, message, done=0.0):
+        with self._lock:
+            # max(): slides can report before the deck's "running" event.
+            self._done[stage] = max(done, self._done.get(stage, 0.0))
+            self.message = message
+            self.fraction = (
+                sum(STAGE_WEIGHTS[s] * d for s, d in self._done.items())
+                / sum(STAGE_WEIGHTS[s] for s in self._done)
+            )
+
+    def _finish(self, error=None):
+        with self._lock:
+            self.error = error
+            self.state = "failed" if error is not None else "done"
+            if error is None:
+                self.fraction = 1.0
+            self.finished = time.time()
+
+
+def _executor():
+    global _pool
+    if _pool is None:
+        with _lock:
+            if _pool is None:
+                _pool = ThreadPoolExecutor(max_workers=JOB_WORKERS, thread_name_prefix="quote-job")
+    return _pool
+
+
+def _run(job):
+    from quote_engine.document import RASTER_PRICE_TABLE
+    from quote_engine.generate import TASK_LABELS
+
+    with _lock:
+        if job.forgotten:
+            return
+        job._start(["pricing", "layout"] + (["table"] if RASTER_PRICE_TABLE else []) + ["docx", "pptx", "save"])
+
+    def progress(task, state, seconds, fraction):
+        if state == "running":
+            job._progress(task, f"{TASK_LABELS[task]}...")
+        elif state == "done":
+            job._progress(task, f"{TASK_LABELS[task]} ready ({seconds:.1f} s)", 1.0)
+
+    def on_slide(done, count):
+        job._progress("pptx", f"PowerPoint slide {done} of {count}", done / count)
+
+    try:
+        # One trace per job; the wait in the queue is logged with it.
+        with tracing.span("job", job=job.id, queued_ms=round((time.time() - job.submitted) * 1000, 3)):
+            job._progress("pricing", "Pricing...")
+            job.priced = api.price_quote(job.quote)
+            job._progress("pricing", "Priced", 1.0)
+            job._progress("layout", "Matching layout images...")
+            layout, job.notes = api.resolve_quote_layout(job.quote)
+            job._progress("layout", "Layout images ready", 1.0)
+            job.documents = api.generate_quote(
+                job.quote, priced=job.priced, layout=layout, progress=progress, on_slide=on_slide
+            )
+    except Exception as exc:
+        job._finish(exc)
+    else:
+        job._finish()
+    with _lock:
+        if job.forgotten:
+            _jobs.pop(job.id, None)
+
+
+def _abandoned(job, cutoff):
+    return job.finished is not None and max(job.finished, job.polled) < cutoff
+
+
+def _prune():
+    # Caller holds _lock.
+    cutoff = time.time() - JOB_RESULT_TTL
+    for job_id in [job_id for job_id, job in _jobs.items() if _abandoned(job, cutoff)]:
+        del _jobs[job_id]
+
+
+def _make_room():
+    # Caller holds _lock. Uncollected results count against the limit as
+    # well; the oldest of those no page is polling for go first.
+    limit = JOB_WORKERS + JOB_QUEUE_DEPTH
+    cutoff = time.time() - JOB_POLL_GRACE
+    abandoned = sorted((job for job in _jobs.values() if _abandoned(job, cutoff)), key=lambda job: job.finished)
+    for job in abandoned[:max(0, len(_jobs) - limit + 1)]:
+        del _jobs[job.id]
+    return len(_jobs) < limit
+
+
+def submit(quote):
+    """
+    Queue a QuoteInput or quote dict for generation; returns the job id.
+    Raises api.QuoteValidationError for an incomplete quote and JobQueueFull
+    when too many jobs are already pending.
+    """
+    quote = api.validate(quote)
+    job = Job(quote)
+    with _lock:
+        _prune()
+        # Jobs handed to the pool stay "queued" until a worker picks them up,
+        # so everything held counts against workers plus queue depth.
+        if not _make_room():
+            raise JobQueueFull(f"{JOB_QUEUE_DEPTH} quotes are already waiting to be generated")
+        _jobs[job.id] = job
+    _executor().submit(_run, job)
+    return job.id
+
+
+def get(job_id):
+    """The Job for an id from submit(), or None once it has expired."""
+    with _lock:
+        _prune()
+        job = _jobs.get(job_id)
+        if job is not None:
+            job.polled = time.time()
+        return job
+
+
+def forget(job_id):
+    """
+    Drop a job and its documents once its result was collected or is no
+    longer wanted. A queued job never runs; a running one is dropped as soon
+    as it finishes.
+    """
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None:
+            return
+        job.forgotten = True
+        if job.state != "running":
+            del _jobs[job_id]
+
+
+def queue_position(job_id):
+    """Number of queued jobs submitted before this one (0 once it runs)."""
+    with _lock:
+        job = _jobs.get(job_id)
+        if job is None or job.state != "queued":
+            return 0
+        return sum(1 for other in _jobs.values() if other.state == "queued" and other.submitted < job.submitted)
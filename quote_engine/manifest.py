@@ -0,0 +1,237 @@
+'''
+In-memory index of the image assets.
+
+Resolving a layout used to stat Assets/<config_id>, then every alternate
+gripper folder, then iso/top/front and each robot_*/gripper_* picture. The
+manifest walks the repo root and Assets/ once and answers all of those from
+dicts. It records each image's pixel size, DPI, byte size and sha256, and
+each config folder's parsed attributes (arms, robot, disposition, VRS model,
+gripper). Layout code takes image geometry from here instead of opening the
+files. Files unchanged since the asset bundle was built (see
+quote_engine.bundle) take their metadata from it without being read; without
+a bundle, the metadata is kept in CACHE_DIR/image_index.json so only new or
+changed files are read again after a restart.
+
+get_manifest() rebuilds it when the root, Assets/ or a config folder's
+directory mtime changes, or the mtime or size of an image it lists does (an
+image copied over in place leaves its folder's mtime alone). It checks at
+most every MANIFEST_CHECK_SECONDS so a slow (network) mount isn't stat'ed on
+every lookup.
+'''
+import hashlib
+import json
+import os
+import re
+import threading
+import time
+from collections import namedtuple
+from io import BytesIO
+
+from PIL import Image as PILImage
+
+from quote_engine.bundle import get_bundle, relative_name
+from quote_engine.paths import ASSETS_DIR, BASE_DIR, CACHE_DIR
+
+IMAGE_SUFFIXES = (".png", ".jpg", ".jpeg")
+VIEWS = ("iso", "top", "front")
+MANIFEST_CHECK_SECONDS = float(os.environ.get("QUOTE_MANIFEST_CHECK_SECONDS", "5"))
+# Repo-relative path -> [mtime_ns, size, sha256, width, height, dpi], the
+# bundle's "files" format.
+INDEX_PATH = os.path.join(CACHE_DIR, "image_index.json")
+
+ImageInfo = namedtuple("ImageInfo", "path width height dpi size sha256")
+
+# One Assets/<config_id> folder. views maps "iso"/"top"/"front" to the
+# ImageInfo of the views present. Attributes are None if the name doesn't
+# follow <arms>arms_<robot>_<disposition>_<vrs>_<gripper>.
+ConfigEntry = namedtuple(
+    "ConfigEntry",
+    "config_id folder arms robot disposition vrs_model gripper views",
+)
+
+# "2arms_fanuc_m20_ftf_1800_pinchr_lr_and_m10": robot and gripper may contain
+# underscores; disposition is one token and the VRS model is all digits.
+CONFIG_ID_RE = re.compile(r"^(\d+)arms_(.+?)_([a-z0-9]+)_(\d+)_(.+)$")
+
+
+def _key(path):
+    # Same case rules as the filesystem lookups this replaces.
+    return os.path.normcase(os.path.abspath(path))
+
+
+def read_image_info(path, data=None):
+    """ImageInfo of a file, reading it (or `data`, its bytes) and its image header."""
+    if data is None:
+        with open(path, "rb") as f:
+            data = f.read()
+    try:
+        # Only the header is parsed; the pixels are never decoded.
+        with PILImage.open(BytesIO(data)) as img:
+            width, height = img.size
+            dpi = img.info.get("dpi")
+    except OSError:
+        width = height = dpi = None
+    return ImageInfo(path, width, height, dpi, len(data), hashlib.sha256(data).hexdigest())
+
+
+def _image_info(path, bundle=None, root=BASE_DIR, index=None):
+    # (ImageInfo, whether the file had to be read, its (mtime_ns, size)).
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    name = relative_name(path, root)
+    packed = bundle.file_info(name, stamp) if bundle is not None else None
+    if packed is None and index:
+        entry = index.get(name)
+        if entry is not None and (entry[0], entry[1]) == stamp:
+            packed = entry[2], entry[3], entry[4], tuple(entry[5]) if entry[5] else entry[5]
+    if packed is not None:
+        sha256, width, height, dpi = packed
+        return ImageInfo(path, width, height, dpi, st.st_size, sha256), False, stamp
+    return read_image_info(path), True, stamp
+
+
+def _load_index(path=INDEX_PATH):
+    try:
+        with open(path, encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return {}
+
+
+def _save_index(images, root, path=INDEX_PATH):
+    files = {}
+    for info in images.values():
+        try:
+            st = os.stat(info.path)
+        except OSError:
+            continue
+        files[relative_name(info.path, root)] = [
+            st.st_mtime_ns, st.st_size, info.sha256, info.width, info.height, info.dpi,
+        ]
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump(files, f)
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def parse_config_id(config_id):
+    """(arms, robot, disposition, vrs_model, gripper), or None if unparseable."""
+    match = CONFIG_ID_RE.match(config_id)
+    if match is None:
+        return None
+    arms, robot, disposition, vrs_model, gripper = match.groups()
+    return int(arms), robot, disposition, vrs_model, gripper
+
+
+class AssetManifest:
+    """Snapshot of every image under `root` (top level) and root/Assets."""
+
+    def __init__(self, root=BASE_DIR):
+        self.root = root
+        self.assets_dir = os.path.join(root, ASSETS_DIR)
+        self.images = {}    # normcase'd absolute path -> ImageInfo
+        self.configs = {}   # config_id -> ConfigEntry
+        self.by_attributes = {}  # (arms, robot, disposition, vrs_model, gripper) -> ConfigEntry
+        self.stamp = directory_stamp(root)
+        self.file_stamps = {}  # image path -> (mtime_ns, size) when scanned
+        # Metadata of unchanged files comes from the packed bundle, if built,
+        # or the index saved by an earlier scan.
+        self._bundle = get_bundle()
+        # The index only describes the repo's own assets.
+        self._index = _load_index() if root == BASE_DIR else None
+        self._read = 0
+        self._scan()
+        if self._index is not None and (self._read or len(self._index) != len(self.images)):
+            _save_index(self.images, root)
+        self._bundle = self._index = None
+
+    def _add_image(self, path):
+        info, read, self.file_stamps[path] = _image_info(path, self._bundle, self.root, self._index)
+        self._read += read
+        self.images[_key(path)] = info
+        return info
+
+    def _scan(self):
+        for name in sorted(os.listdir(self.root)):
+            path = os.path.join(self.root, name)
+            if name.lower().endswith(IMAGE_SUFFIXES) and os.path.isfile(path):
+                self._add_image(path)
+
+        if not os.path.isdir(self.assets_dir):
+            return
+        for dirpath, dirs, files in os.walk(self.assets_dir):
+            dirs.sort()
+            infos = {}
+            for name in sorted(files):
+                if name.lower().endswith(IMAGE_SUFFIXES):
+                    infos[name] = self._add_image(os.path.join(dirpath, name))
+            if os.path.dirname(dirpath) != self.assets_dir:
+                continue  # only direct children are config folders
+            config_id = os.path.basename(dirpath)
+            views = {view: infos[f"{view}.png"] for view in VIEWS if f"{view}.png" in infos}
+            attributes = parse_config_id(config_id)
+            entry = ConfigEntry(config_id, dirpath, *(attributes or (None,) * 5), views)
+            self.configs[config_id] = entry
+            if attributes is not None:
+                self.by_attributes[attributes] = entry
+
+    def changed(self):
+        """Whether a directory or any listed image changed since the scan."""
+        if directory_stamp(self.root) != self.stamp:
+            return True
+        for path, stamp in self.file_stamps.items():
+            try:
+                st = os.stat(path)
+            except OSError:
+                return True
+            if (st.st_mtime_ns, st.st_size) != stamp:
+                return True
+        return False
+
+    def exists(self, path):
+        return _key(path) in self.images
+
+    def info(self, path):
+        """ImageInfo for an image path, or None if it isn't in the manifest."""
+        return self.images.get(_key(path))
+
+    def config(self, config_id):
+        return self.configs.get(config_id)
+
+
+def directory_stamp(root=BASE_DIR):
+    """mtimes of the root, Assets/ and each config folder."""
+    stamp = [os.stat(root).st_mtime_ns]
+    assets_dir = os.path.join(root, ASSETS_DIR)
+    try:
+        with os.scandir(assets_dir) as it:
+            entries = sorted((e.name, e.stat().st_mtime_ns) for e in it if e.is_dir())
+        stamp.append(os.stat(assets_dir).st_mtime_ns)
+    except OSError:
+        entries = []
+    stamp.extend(entries)
+    return tuple(stamp)
+
+
+_manifest = None
+_checked_at = 0.0
+_lock = threading.Lock()
+
+
+def get_manifest(root=BASE_DIR):
+    """The process-wide manifest, rebuilt when the asset directories or images change."""
+    global _manifest, _checked_at
+    now = time.monotonic()
+    manifest = _manifest
+    if manifest is not None and manifest.root == root and now - _checked_at < MANIFEST_CHECK_SECONDS:
+        return manifest
+    with _lock:
+        manifest = _manifest
+        if manifest is None or manifest.root != root or manifest.changed():
+            manifest = _manifest = AssetManifest(root)
+        _checked_at = now
+    return manifest
@@ -0,0 +1,143 @@
+'''
+Nearest-configuration matching for layout renders.
+
+When Assets/<config_id> doesn't exist, nearest_config() ranks the config
+folders in the asset manifest on weighted attributes (arm count, robot
+family, disposition, VRS width, gripper) and returns the best one with a
+score between 0 and 1. The per-folder features are computed once per
+manifest snapshot and results are memoized, so a lookup is a dict hit or a
+single vectorized pass over the precomputed features.
+'''
+import os
+import threading
+
+import numpy as np
+
+from quote_engine.manifest import get_manifest
+
+# Relative importance of each attribute; they sum to 1 so scores are in [0, 1].
+WEIGHTS = {
+    "arms": 0.3,
+    "robot": 0.25,
+    "vrs_model": 0.2,
+    "disposition": 0.15,
+    "gripper": 0.1,
+}
+# Below this the renders look too different; use the default images instead.
+MIN_SCORE = float(os.environ.get("QUOTE_MATCH_MIN_SCORE", "0.6"))
+
+_index = (None, None)  # (manifest, its ConfigIndex)
+_lock = threading.Lock()
+
+
+def _number(text):
+    try:
+        return int(text)
+    except (TypeError, ValueError):
+        return None
+
+
+def _ratio(a, b):
+    """1 for equal numbers, falling towards 0 as they grow apart."""
+    if a is None or b is None:
+        return 0.0
+    if a == b:
+        return 1.0
+    return min(a, b) / max(a, b) if max(a, b) > 0 else 0.0
+
+
+def _tokens(robot):
+    # "fanuc_m20_fanuc_m710" -> {"fanuc", "m20", "m710"}
+    return frozenset(robot.split("_")) if robot else frozenset()
+
+
+class ConfigIndex:
+    """
+    Matching features for the config folders of one manifest. Each attribute
+    is stored as integer codes into its distinct values, so a query scores
+    every folder with a handful of small lookups and one vector sum.
+    """
+
+    def __init__(self, manifest):
+        self.entries = [
+            entry for entry in manifest.configs.values()
+            if entry.arms is not None and entry.views
+        ]
+        self._values = {}
+        self._codes = {}
+        columns = {
+            "arms": [entry.arms for entry in self.entries],
+            "robot": [_tokens(entry.robot) for entry in self.entries],
+            "vrs_model": [_number(entry.vrs_model) for entry in self.entries],
+            "disposition": [entry.disposition for entry in self.entries],
+            "gripper": [entry.gripper for entry in self.entries],
+        }
+        for name, column in columns.items():
+            values = list(dict.fromkeys(column))
+            position = {value: i for i, value in enumerate(values)}
+            self._values[name] = values
+            self._codes[name] = np.array([position[value] for value in column], dtype=np.intp)
+        self._view_counts = np.array([len(entry.views) for entry in self.entries])
+        self._memo = {}
+
+    def scores(self, arms, robot, disposition, vrs_model, gripper):
+        """Score of every entry (same order as self.entries) for a query."""
+        robot_tokens = _tokens(robot)
+        vrs = _number(vrs_model)
+        similarity = {
+            "arms": lambda value: _ratio(arms, value),
+            "robot": lambda value: len(robot_tokens & value) / len(robot_tokens | value) if robot_tokens | value else 0.0,
+            "vrs_model": lambda value: _ratio(vrs, value),
+            "disposition": lambda value: float(disposition == value),
+            "gripper": lambda value: float(gripper == value),
+        }
+        total = np.zeros(len(self.entries))
+        for name, weight in WEIGHTS.items():
+            table = np.array([similarity[name](value) for value in self._values[name]])
+            total += weight * table[self._codes[name]]
+        return total
+
+    def nearest(self, arms, robot, disposition, vrs_model, gripper):
+        """(ConfigEntry, score) of the best match, or (None, 0.0) if there are none."""
+        key = (arms, robot, disposition, vrs_model, gripper)
+        cached = self._memo.get(key)
+        if cached is not None:
+            return cached
+        if not self.entries:
+            return None, 0.0
+        scores = self.scores(arms, robot, disposition, vrs_model, gripper)
+        # Ties go to the folder with more views, then the first by name.
+        best = np.flatnonzero(scores >= scores.max() - 1e-9)
+        i = best[np.argmax(self._view_counts[best])]
+        result = (self.entries[i], round(float(scores[i]), 4))
+        self._memo[key] = result
+        return result
+
+
+def config_index(manifest=None):
+    """The ConfigIndex of `manifest` (default: the current asset manifest)."""
+    global _index
+    manifest = manifest or get_manifest()
+    cached_manifest, index = _index
+    if cached_manifest is not manifest:
+        with _lock:
+            cached_manifest, index = _index
+            if cached_manifest is not manifest:
+                index = ConfigIndex(manifest)
+                _index = (manifest, index)
+    return index
+
+
+def nearest_config(arms, robot, disposition, vrs_model, gripper, min_score=None):
+    """
+    Best existing configuration for sanitized attributes (as used in
+    config ids), e.g. nearest_config(2, "fanuc_m20", "ftf", "1600", "ventur").
+    Returns (ConfigEntry, score), or (None, score) when nothing reaches
+    `min_score` (default MIN_SCORE).
+    """
+    if min_score is None:
+        min_score = MIN_SCORE
+    entry, score = config_index().nearest(arms, robot, disposition, vrs_model, gripper)
+    if entry is None or score < min_score:
+        return None, score
+    return entry, score
@@ -0,0 +1,90 @@
+'''
+Output buffers for generated documents.
+
+Documents are saved straight into memory and the bytes handed to whatever
+serves them (st.download_button, the artifact cache). Nothing is written to
+disk unless QUOTE_OUTPUT_DIR is set; then every document is also spilled
+into its SPILL_SUBDIR subdirectory, and spilled documents older than
+QUOTE_OUTPUT_MAX_AGE_HOURS or beyond the newest QUOTE_OUTPUT_MAX_FILES are
+pruned on each write. Nothing else in QUOTE_OUTPUT_DIR is ever touched.
+'''
+import os
+import threading
+import time
+from io import BytesIO
+
+OUTPUT_DIR = os.environ.get("QUOTE_OUTPUT_DIR") or None
+SPILL_SUBDIR = "generated_quotes"
+SPILL_SUFFIXES = (".docx", ".pptx")
+OUTPUT_MAX_AGE_HOURS = float(os.environ.get("QUOTE_OUTPUT_MAX_AGE_HOURS", "72"))
+OUTPUT_MAX_FILES = int(os.environ.get("QUOTE_OUTPUT_MAX_FILES", "200"))
+
+_lock = threading.Lock()
+
+
+def document_bytes(obj):
+    """Save a python-docx/docxtpl document or python-pptx presentation to bytes."""
+    buf = BytesIO()
+    obj.save(buf)
+    return buf.getvalue()
+
+
+def spill_dir(out_dir=None):
+    """Where spill() writes for an output directory (default OUTPUT_DIR), or None when off."""
+    out_dir = out_dir or OUTPUT_DIR
+    return os.path.join(out_dir, SPILL_SUBDIR) if out_dir else None
+
+
+def spill(name, data, out_dir=None):
+    """
+    Keep a copy of `data` (a .docx or .pptx named `name`) in the output
+    directory (default OUTPUT_DIR) and apply the retention policy. Returns
+    the path written, or None when spilling is off.
+    """
+    out_dir = out_dir or OUTPUT_DIR
+    directory = spill_dir(out_dir)
+    if not directory:
+        return None
+    os.makedirs(directory, exist_ok=True)
+    path = os.path.join(directory, os.path.basename(name))
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.part"
+    with open(tmp, "wb") as f:
+        f.write(data)
+    os.replace(tmp, path)
+    prune(out_dir, keep=path)
+    return path
+
+
+def prune(out_dir=None, max_age_hours=None, max_files=None, keep=None):
+    """
+    Delete spilled documents that are too old or beyond the newest
+    `max_files`. Only .docx/.pptx files in the spill subdirectory of
+    `out_dir` (default OUTPUT_DIR) are considered.
+    """
+    directory = spill_dir(out_dir)
+    if not directory or not os.path.isdir(directory):
+        return
+    if max_age_hours is None:
+        max_age_hours = OUTPUT_MAX_AGE_HOURS
+    if max_files is None:
+        max_files = OUTPUT_MAX_FILES
+    cutoff = time.time() - max_age_hours * 3600
+    with _lock:
+        entries = []
+        for name in os.listdir(directory):
+            if not name.lower().endswith(SPILL_SUFFIXES):
+                continue  # another writer's .part file, or not ours
+            path = os.path.join(directory, name)
+            try:
+                mtime = os.stat(path).st_mtime
+            except OSError:
+                continue
+            entries.append((mtime, path))
+        entries.sort(reverse=True)  # newest first
+        for i, (mtime, path) in enumerate(entries):
+            if path == keep or (mtime >= cutoff and i < max_files):
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
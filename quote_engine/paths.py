@@ -0,0 +1,27 @@
+'''
+Filesystem locations used by the quote engine.
+'''
+import os
+
+# Repository root: pricing.csv, the DOCX template and all images live here.
+BASE_DIR = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# Per-configuration layout renders: BASE_DIR/Assets/<config_id>/{iso,top,front}.png
+ASSETS_DIR = "Assets"
+
+# Derived data (catalog snapshots, caches). Override with QUOTE_CACHE_DIR.
+CACHE_DIR = os.environ.get("QUOTE_CACHE_DIR", os.path.join(BASE_DIR, ".cache"))
+
+
+def resolve_path(name):
+    """Return an absolute path for a repo-relative data file."""
+    if os.path.isabs(name):
+        return name
+    return os.path.join(BASE_DIR, name)
+
+
+def cache_path(*parts):
+    """Return a path under CACHE_DIR, creating its parent directory."""
+    path = os.path.join(CACHE_DIR, *parts)
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    return path
@@ -0,0 +1,224 @@
+'''
+Price breakdown table for quote documents.
+
+The DOCX and PPTX get a native table (text stays selectable and scales with
+the page). save_df_as_image() keeps the old matplotlib rendering for anyone
+who opts into a raster table; its PNGs are cached by table content and
+currency (the newest QUOTE_RASTER_CACHE_ENTRIES in memory, up to
+QUOTE_RASTER_CACHE_MB under CACHE_DIR/tables), and matplotlib is only
+imported when it is actually used.
+'''
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from io import BytesIO
+
+import pandas as pd
+from docx.oxml import OxmlElement
+from docx.oxml.ns import qn
+from docx.shared import Mm, Pt, RGBColor
+from pptx.dml.color import RGBColor as PptxRGBColor
+from pptx.util import Pt as PptxPt
+
+from quote_engine import tracing
+from quote_engine.artifacts import evict
+from quote_engine.paths import CACHE_DIR, cache_path
+
+HEADER_FILL = "EF3A2D"
+STRIPE_FILL = "F2F2F2"
+FONT_SIZE = 10
+
+# Share of the table width per column, same order as the breakdown columns.
+COLUMN_SHARES = {"Component": 0.2, "Description": 0.38, "Unit Price": 0.16, "Qty": 0.08, "Subtotal": 0.18}
+
+RASTER_CACHE_ENTRIES = int(os.environ.get("QUOTE_RASTER_CACHE_ENTRIES", "32"))
+RASTER_CACHE_MB = float(os.environ.get("QUOTE_RASTER_CACHE_MB", "50"))
+RASTER_DIR = os.path.join(CACHE_DIR, "tables")
+
+# (sha256 of table + currency) -> PNG bytes, least recently used first
+_rasters = OrderedDict()
+_raster_lock = threading.Lock()
+
+
+def table_rows(df, currency="CAD"):
+    """Header and body rows as display strings, prices formatted in `currency`."""
+    df = df.copy()
+    df["Unit Price"] = df["Unit Price"].map(lambda x: f"{currency} {x:,.0f}")
+    df["Subtotal"] = df["Subtotal"].map(lambda x: f"{currency} {x:,.0f}")
+    header = [str(c) for c in df.columns]
+    rows = [[str(v) for v in row] for row in df.values.tolist()]
+    return header, rows
+
+
+def _column_widths(columns, width):
+    shares = [COLUMN_SHARES.get(c, 1.0 / len(columns)) for c in columns]
+    scale = sum(shares)
+    return [int(width * share / scale) for share in shares]
+
+
+def _shade(cell, fill):
+    tc_pr = cell._tc.get_or_add_tcPr()
+    shd = OxmlElement("w:shd")
+    shd.set(qn("w:val"), "clear")
+    shd.set(qn("w:color"), "auto")
+    shd.set(qn("w:fill"), fill)
+    tc_pr.append(shd)
+
+
+def _set_cell_text(cell, text, bold=False, color=None):
+    paragraph = cell.paragraphs[0]
+    paragraph.paragraph_format.space_before = Pt(2)
+    paragraph.paragraph_format.space_after = Pt(2)
+    run = paragraph.add_run(text)
+    run.font.size = Pt(FONT_SIZE)
+    run.font.bold = bold
+    if color is not None:
+        run.font.color.rgb = color
+
+
+def add_docx_price_table(doc, paragraph, df, currency="CAD", width=Mm(160)):
+    """
+    Replace `paragraph` of a python-docx document with the breakdown as a
+    Word table: red header row, striped body, "Table Grid" borders.
+    """
+    header, rows = table_rows(df, currency)
+    table = doc.add_table(rows=len(rows) + 1, cols=len(header))
+    table.style = "Table Grid"
+    table.autofit = False
+    widths = _column_widths(header, width)
+
+    for col_idx, text in enumerate(header):
+        cell = table.cell(0, col_idx)
+        _shade(cell, HEADER_FILL)
+        _set_cell_text(cell, text, bold=True, color=RGBColor(0xFF, 0xFF, 0xFF))
+    # Repeat the header row if the table breaks across pages
+    tr_pr = table.rows[0]._tr.get_or_add_trPr()
+    tr_pr.append(OxmlElement("w:tblHeader"))
+
+    for row_idx, row in enumerate(rows, 1):
+        for col_idx, text in enumerate(row):
+            cell = table.cell(row_idx, col_idx)
+            if row_idx % 2 == 0:
+                _shade(cell, STRIPE_FILL)
+            _set_cell_text(cell, text)
+
+    for column, w in zip(table.columns, widths):
+        for cell in column.cells:
+            cell.width = w
+
+    # add_table() appends to the end of the body; move it into place.
+    paragraph._p.addprevious(table._tbl)
+    paragraph._p.getparent().remove(paragraph._p)
+    return table
+
+
+def add_pptx_price_table(slide, df, currency, left, top, width, row_height):
+    """Add the breakdown to a slide as a native PowerPoint table."""
+    header, rows = table_rows(df, currency)
+    shape = slide.shapes.add_table(len(rows) + 1, len(header), left, top, width, row_height * (len(rows) + 1))
+    table = shape.table
+    for column, w in zip(table.columns, _column_widths(header, width)):
+        column.width = w
+
+    for row_idx, row in enumerate([header] + rows):
+        if row_idx == 0:
+            fill, color = HEADER_FILL, "FFFFFF"
+        else:
+            fill, color = (STRIPE_FILL if row_idx % 2 == 0 else "FFFFFF"), "0C0C0C"
+        for col_idx, text in enumerate(row):
+            cell = table.cell(row_idx, col_idx)
+            cell.fill.solid()
+            cell.fill.fore_color.rgb = PptxRGBColor.from_string(fill)
+            cell.text = text
+            font = cell.text_frame.paragraphs[0].font
+            font.size = PptxPt(FONT_SIZE)
+            font.bold = row_idx == 0
+            font.color.rgb = PptxRGBColor.from_string(color)
+    return table
+
+
+def _raster_key(df, currency):
+    h = hashlib.sha256(currency.encode())
+    h.update("\x1f".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+    return h.hexdigest()
+
+
+def _render_raster(df, currency):
+    # An explicit Figure on an Agg canvas: pyplot's global figure state isn't
+    # safe to use from the generation pool's and job queue's threads.
+    from matplotlib.backends.backend_agg import FigureCanvasAgg
+    from matplotlib.figure import Figure
+
+    header, rows = table_rows(df, currency)
+    fig = Figure(figsize=(10, len(rows) * 0.5 + 1))
+    FigureCanvasAgg(fig)
+    ax = fig.subplots()
+    ax.axis("off")
+
+    table = ax.table(
+        cellText=rows,
+        colLabels=header,
+        cellLoc='left',
+        loc='center'
+    )
+    table.auto_set_font_size(False)
+    table.set_fontsize(FONT_SIZE)
+
+    for i in range(len(header)):
+        table[0, i].set_facecolor("#" + HEADER_FILL.lower())
+        table[0, i].set_text_props(weight="bold", color="white")
+
+    for row_idx in range(1, len(rows) + 1):
+        color = "#" + STRIPE_FILL.lower() if row_idx % 2 == 0 else "#ffffff"
+        for col_idx in range(len(header)):
+            table[row_idx, col_idx].set_facecolor(color)
+
+    fig.tight_layout()
+
+    buf = BytesIO()
+    fig.savefig(buf, format="png", dpi=300, bbox_inches="tight")
+    return buf.getvalue()
+
+
+def _raster(df, currency):
+    key = _raster_key(df, currency)
+    with _raster_lock:
+        data = _rasters.get(key)
+        if data is not None:
+            _rasters.move_to_end(key)
+            return data
+    disk_path = cache_path("tables", f"{key[:32]}.png")
+    try:
+        with open(disk_path, "rb") as f:
+            data = f.read()
+        os.utime(disk_path)  # mark as recently used
+    except OSError:
+        data = _render_raster(df, currency)
+        try:
+            tmp = f"{disk_path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            with open(tmp, "wb") as f:
+                f.write(data)
+            os.replace(tmp, disk_path)
+        except OSError:
+            pass
+        else:
+            evict(int(RASTER_CACHE_MB * 1024 * 1024), keep=disk_path, directory=RASTER_DIR)
+    with _raster_lock:
+        _rasters[key] = data
+        _rasters.move_to_end(key)
+        while len(_rasters) > RASTER_CACHE_ENTRIES:
+            _rasters.popitem(last=False)
+    return data
+
+
+def save_df_as_image(df, currency="CAD"):
+    """
+    The breakdown as a 300 dpi PNG (BytesIO). Cached in memory and under
+    CACHE_DIR/tables, so an unchanged table is only rasterized once.
+    """
+    with tracing.span("table") as sp:
+        data = _raster(df, currency)
+        sp.bytes = len(data)
+    return BytesIO(data)
@@ -0,0 +1,361 @@
+'''
+Pricing engine for the Waste Robotics quote generator.
+
+pricing.csv is parsed once into a PriceCatalog that indexes every SKU by the
+UI option that selects it. A price breakdown is then a single pass over the
+selected options joined against that index - no Streamlit, no pandas.
+
+Catalogs are cached process-wide and only rebuilt when the CSV changes on
+disk; a binary snapshot lets a fresh process skip CSV parsing altogether.
+'''
+import csv
+import functools
+import hashlib
+import io
+import os
+import pickle
+import threading
+from array import array
+from collections import namedtuple
+
+from quote_engine.paths import cache_path, resolve_path
+
+PRICING_CSV = "pricing.csv"
+
+# One priced option as offered in the UI.
+#   ui_key    - key in the `inputs` dict built by the form
+#   ui_value  - selected value of that key (True for checkboxes)
+#   sku       - item name in pricing.csv
+#   category  - "Component" column of the breakdown
+#   label     - "Description" column; may use {value}, {qty} and {price}
+SKU_OPTIONS = [
+    # Tab 5 inclusions
+    ("conveyor_var_speed_license", True, "Conveyor_Variable_Speed_License", "Conveyor Variable Speed License", "Conveyor Variable Speed License"),
+    ("custom_ai_training", True, "custom_ai_training", "Custom AI Training", "Custom AI Training"),
+    ("robot_validator_license", True, "robot_validator_license", "Robot Validator License", "Robot Validator License"),
+    ("greyparrot_monitoring_unit", True, "GreyParrot_Monitoring_Unit", "GreyParrot Monitoring Unit", "GreyParrot Monitoring Unit"),
+    ("installation_supervision", True, "installation_Supervision", "Installation Supervision", "Installation Supervision"),
+    ("additional_sorting_recipes", True, "Additional_Sorting_recipes", "Additional Sorting Recipes", "Additional Sorting Recipes"),
+    ("sat_to_cfa", True, "SAT_to_CFA", "SAT to CFA", "SAT to CFA"),
+    ("engineering_and_documentation", True, "Engineering_&_Documentation", "Engineering & Documentation", "Engineering & Documentation"),
+    ("online_commissioning", True, "Online_Commisioning", "Online Commissioning", "Online Commissioning"),
+    ("installation_commissioning_training", True, "Installation_Commisioning_&_Training", "Installation, Commissioning & Training", "Installation, Commissioning & Training"),
+    ("lips2_support", True, "LIPS2_support", "LIPS2 Support", "LIPS2 Support"),
+    ("safety_fencing", True, "safety_fencing", "Safety Fencing", "Robot safety fencing"),
+    ("try_and_buy", True, "try_and_buy_arm", "Try & Buy Second Arm", "Deferred Payment"),
+    # Robot arms
+    ("robot_type", "Fanuc LR-Mate", "Fanuc_LR-Mate", "Robot Arm", "{value}"),
+    ("robot_type", "FanucLr10iA", "FanucLr10iA", "Robot Arm", "{value}"),
+    ("robot_type", "Fanuc Delta DR3", "Fanuc_Delta_DR3", "Robot Arm", "{value}"),
+    ("robot_type", "Fanuc M10", "Fanuc_M10", "Robot Arm", "{value}"),
+    ("robot_type", "Fanuc M20", "Fanuc_M20", "Robot Arm", "{value}"),
+    ("robot_type", "Fanuc M710", "Fanuc_M710", "Robot Arm", "{value}"),
+    # Robot bases
+    ("robot_bases", "LrMate/Lr10ia", "LrMate/Lr10ia", "Robot Base", "{value}"),
+    ("robot_bases", "Delta DR3", "Delta_DR3", "Robot Base", "{value}"),
+    ("robot_bases", "M-10, M-20, M-710", "M10_M20_M710", "Robot Base", "{value}"),
+    # Grippers
+    ("gripper_type", "VentuR", "VentuR", "Gripper", "{value}"),
+    ("gripper_type", "BagR", "BagR", "Gripper", "{value}"),
+    ("gripper_type", "BagR CO", "BagR_CO", "Gripper", "{value}"),
+    ("gripper_type", "PinchR Lr & M10", "PinchR_Lr_&_M10", "Gripper", "{value}"),
+    ("gripper_type", "MonstR", "MonstR", "Gripper", "{value}"),
+    ("gripper_type", "DagR", "DagR", "Gripper", "{value}"),
+    # Backup gripper
+    ("backup_gripper", "VentuR", "VentuR", "Backup Gripper", "Backup: {value}"),
+    ("backup_gripper", "BagR", "BagR", "Backup Gripper", "Backup: {value}"),
+    ("backup_gripper", "BagR CO", "BagR_CO", "Backup Gripper", "Backup: {value}"),
+    ("backup_gripper", "PinchR Lr & M10", "PinchR_Lr_&_M10", "Backup Gripper", "Backup: {value}"),
+    ("backup_gripper", "MonstR", "MonstR", "Backup Gripper", "Backup: {value}"),
+    ("backup_gripper", "DagR", "DagR", "Backup Gripper", "Backup: {value}"),
+    # Vision systems
+    ("vision_system", "DeepVision System", "DeepVision_System", "Vision System", "{value}"),
+    ("vision_system", "HyperVision System", "HyperVision_System", "Vision System", "{value}"),
+    # Shipping
+    ("shipping_method", "Truck", "shipping_truck", "Shipping", "{qty} truck(s) at ${price:,.0f}/truck"),
+    ("shipping_method", "Boat", "shipping_boat_container", "Shipping", "{qty} container(s) at ${price:,.0f}/container (boat)"),
+    # Warranty
+    ("warranty_option", "1 Year (Standard)", "warranty_1yr", "Warranty (1 year)", "Parts + labor coverage (1 year)"),
+    ("warranty_option", "Extended", "warranty_extended", "Warranty (Extended)", "Parts + labor coverage (Extended)"),
+]
+
+# Order in which selections appear on the quote, as (ui_key, kind):
+#   "flag"   - checkbox, priced once when ticked
+#   "count"  - {option name: quantity} dict from a multiselect
+#   "choice" - single selected value from a selectbox
+BREAKDOWN_ORDER = [
+    ("conveyor_var_speed_license", "flag"),
+    ("custom_ai_training", "flag"),
+    ("robot_validator_license", "flag"),
+    ("greyparrot_monitoring_unit", "flag"),
+    ("installation_supervision", "flag"),
+    ("additional_sorting_recipes", "flag"),
+    ("sat_to_cfa", "flag"),
+    ("engineering_and_documentation", "flag"),
+    ("online_commissioning", "flag"),
+    ("installation_commissioning_training", "flag"),
+    ("lips2_support", "flag"),
+    ("robot_type", "count"),
+    ("robot_bases", "count"),
+    ("gripper_type", "count"),
+    ("vision_system", "count"),
+    ("try_and_buy", "flag"),
+    ("shipping_method", "choice"),
+    ("safety_fencing", "flag"),
+    ("warranty_option", "choice"),
+    ("backup_gripper", "choice"),
+]
+
+# Category of "count" options, also used for values missing from SKU_OPTIONS.
+COUNT_CATEGORIES = {
+    "robot_type": "Robot Arm",
+    "robot_bases": "Robot Base",
+    "gripper_type": "Gripper",
+    "vision_system": "Vision System",
+}
+
+# Quantity of a "choice" option, read from another input (defaults to 1).
+CHOICE_QTY_KEYS = {"shipping_method": "num_trucks_or_containers"}
+
+# A "choice" option is only priced when its companion checkbox is ticked.
+CHOICE_GATE_KEYS = {"backup_gripper": "add_backup_gripper"}
+
+# BREAKDOWN_ORDER with the gate and quantity keys resolved up front.
+_PLAN = tuple(
+    (ui_key, kind, CHOICE_GATE_KEYS.get(ui_key), CHOICE_QTY_KEYS.get(ui_key))
+    for ui_key, kind in BREAKDOWN_ORDER
+)
+
+CatalogEntry = namedtuple("CatalogEntry", "sku price category label ui_key ui_value")
+
+# Every input calculate_price_breakdown() reads. Names, notes and the timeline
+# don't change the price, so they're left out of freeze_inputs() snapshots.
+PRICED_KEYS = tuple(sorted({key for row in _PLAN for key in (row[0], row[2], row[3]) if key}))
+
+# One breakdown row of price_snapshot(), in CAD.
+PriceLine = namedtuple("PriceLine", "component description unit_price qty subtotal")
+
+
+class PriceCatalog:
+    """
+    SKU prices from pricing.csv (in CAD), indexed by the UI option that
+    selects each SKU.
+    """
+
+    def __init__(self, prices, version=None):
+        self.prices = dict(prices)
+        # sha256 of the source CSV, None for catalogs built in memory.
+        self.version = version
+        self.entries = {}
+        for ui_key, ui_value, sku, category, label in SKU_OPTIONS:
+            self.entries[(ui_key, ui_value)] = CatalogEntry(
+                sku, self.prices.get(sku, 0.0), category, label, ui_key, ui_value
+            )
+
+    def price(self, sku, default=0.0):
+        return self.prices.get(sku, default)
+
+    def lookup(self, ui_key, ui_value):
+        """
+        Return the CatalogEntry for a UI selection, or None if it is not priced.
+        Unknown multiselect values are looked up as raw SKUs (price 0 if absent).
+        """
+        entry = self.entries.get((ui_key, ui_value))
+        if entry is None and ui_key in COUNT_CATEGORIES:
+            entry = CatalogEntry(
+                ui_value, self.prices.get(ui_value, 0.0), COUNT_CATEGORIES[ui_key], "{value}", ui_key, ui_value
+            )
+        return entry
+
+
+def parse_prices(text):
+    """Parse pricing CSV text (item,price_cad) into a {sku: price} dict."""
+    prices = {}
+    for row in csv.DictReader(io.StringIO(text)):
+        prices[row["item"]] = float(str(row["price_cad"]).replace(",", ""))
+    return prices
+
+
+def read_prices(path):
+    """Parse a pricing CSV file into a {sku: price} dict."""
+    with open(path, newline="", encoding="utf-8") as f:
+        return parse_prices(f.read())
+
+
+# Bump when the snapshot layout changes so stale snapshots are ignored.
+SNAPSHOT_FORMAT = 1
+
+# path -> ((mtime_ns, size), PriceCatalog), shared by every session.
+_catalogs = {}
+_catalogs_lock = threading.Lock()
+
+
+def _snapshot_path(path):
+    key = hashlib.sha1(path.encode("utf-8")).hexdigest()[:12]
+    return cache_path("catalog", f"{key}.pickle")
+
+
+def _read_snapshot(path):
+    try:
+        with open(_snapshot_path(path), "rb") as f:
+            snapshot = pickle.load(f)
+    except (OSError, pickle.UnpicklingError, EOFError, AttributeError, ValueError):
+        return None
+    if not isinstance(snapshot, dict) or snapshot.get("format") != SNAPSHOT_FORMAT:
+        return None
+    return snapshot
+
+
+def _write_snapshot(path, stamp, catalog):
+    snapshot = {
+        "format": SNAPSHOT_FORMAT,
+        "stamp": stamp,
+        "sha256": catalog.version,
+        "skus": tuple(catalog.prices),
+        "prices": array("d", catalog.prices.values()),
+    }
+    try:
+        target = _snapshot_path(path)
+        tmp = f"{target}.{os.getpid()}.tmp"
+        with open(tmp, "wb") as f:
+            pickle.dump(snapshot, f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp, target)
+    except OSError:
+        # A read-only cache directory only costs us the cold-start shortcut.
+        pass
+
+
+def _catalog_from_snapshot(snapshot):
+    return PriceCatalog(zip(snapshot["skus"], snapshot["prices"]), version=snapshot["sha256"])
+
+
+def _build_catalog(path, stamp, previous):
+    snapshot = _read_snapshot(path)
+    if snapshot is not None and snapshot["stamp"] == stamp:
+        return _catalog_from_snapshot(snapshot)
+
+    with open(path, "rb") as f:
+        data = f.read()
+    digest = hashlib.sha256(data).hexdigest()
+    if previous is not None and previous.version == digest:
+        # Touched but not edited: keep the catalog, refresh the snapshot stamp.
+        catalog = previous
+    elif snapshot is not None and snapshot["sha256"] == digest:
+        catalog = _catalog_from_snapshot(snapshot)
+    else:
+        catalog = PriceCatalog(parse_prices(data.decode("utf-8")), version=digest)
+    _write_snapshot(path, stamp, catalog)
+    return catalog
+
+
+def load_catalog(path=PRICING_CSV):
+    """
+    Return the process-wide PriceCatalog for a pricing CSV.
+
+    A call costs one stat() while the file is unchanged. When its mtime or
+    size changes the file is re-hashed and only re-parsed if the content
+    actually differs.
+    """
+    path = resolve_path(path)
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _catalogs.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    with _catalogs_lock:
+        cached = _catalogs.get(path)
+        if cached is not None and cached[0] == stamp:
+            return cached[1]
+        catalog = _build_catalog(path, stamp, cached[1] if cached else None)
+        _catalogs[path] = (stamp, catalog)
+        return catalog
+
+
+def select_options(inputs):
+    """
+    Yield (ui_key, ui_value, qty) for every priced selection in `inputs`,
+    in the order the lines appear on the quote.
+    """
+    get = inputs.get
+    for ui_key, kind, gate, qty_key in _PLAN:
+        if kind == "flag":
+            if get(ui_key):
+                yield ui_key, True, 1
+        elif kind == "count":
+            selected = get(ui_key)
+            if selected:
+                for value, qty in selected.items():
+                    yield ui_key, value, qty
+        elif gate is None or get(gate):
+            value = get(ui_key)
+            if value is not None:
+                yield ui_key, value, int(get(qty_key, 1)) if qty_key else 1
+
+
+def calculate_price_breakdown(inputs, catalog=None):
+    """
+    Price a configuration.
+
+    `inputs` is the dict collected by the form (see app.py). Returns one row
+    per priced line with Component, Description, Unit Price, Qty and
+    Subtotal, all prices in CAD.
+    """
+    if catalog is None:
+        catalog = load_catalog()
+    entries = catalog.entries
+    breakdown = []
+    for ui_key, value, qty in select_options(inputs):
+        entry = entries.get((ui_key, value))
+        if entry is None:
+            entry = catalog.lookup(ui_key, value)
+            if entry is None:
+                continue
+        _, price, category, label, _, _ = entry
+        if label == "{value}":
+            label = value
+        elif "{" in label:
+            label = label.format(value=value, qty=qty, price=price)
+        breakdown.append({
+            "Component": category,
+            "Description": label,
+            "Unit Price": price,
+            "Qty": qty,
+            "Subtotal": price * qty,
+        })
+    return breakdown
+
+
+def freeze_inputs(inputs):
+    """
+    Hashable snapshot of the priced inputs. "count" dicts become tuples of
+    their items, in selection order since that is the order of the lines.
+    """
+    snapshot = []
+    for key in PRICED_KEYS:
+        value = inputs.get(key)
+        if isinstance(value, dict):
+            value = tuple(value.items())
+        snapshot.append((key, value))
+    return tuple(snapshot)
+
+
+@functools.lru_cache(maxsize=512)
+def _price_frozen(catalog, snapshot):
+    inputs = {key: dict(value) if key in COUNT_CATEGORIES and value else value for key, value in snapshot}
+    lines = tuple(
+        PriceLine(row["Component"], row["Description"], row["Unit Price"], row["Qty"], row["Subtotal"])
+        for row in calculate_price_breakdown(inputs, catalog)
+    )
+    return lines, sum(line.subtotal for line in lines)
+
+
+def price_snapshot(snapshot, catalog=None):
+    """
+    (PriceLine tuple, total) in CAD for a freeze_inputs() snapshot.
+
+    Memoized per catalog, so re-pricing a configuration that was already
+    seen (every rerun that only touched unpriced fields) is a dict lookup.
+    """
+    if catalog is None:
+        catalog = load_catalog()
+    return _price_frozen(catalog, snapshot)
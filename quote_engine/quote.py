@@ -0,0 +1,217 @@
+'''
+Quote fields, validation and pricing shared by the Streamlit app and the
+headless batch generator.
+
+A quote is a dict holding every value the five form tabs collect (see
+DEFAULT_FIELDS for the keys). QuoteInput is the same set of fields as a
+typed object, for callers outside the app.
+'''
+import copy
+import datetime
+from dataclasses import MISSING, dataclass, field, fields
+from typing import Dict, List, Optional
+
+from quote_engine.pricing import calculate_price_breakdown
+
+# All prices in CSV are in CAD, so CAD is the base currency
+CURRENCY_CONVERSION = {"CAD": 1.0, "USD": 0.74, "EUR": 0.68}
+
+TIMELINE_FIELDS = [
+    "order_confirmation_project_kickoff",
+    "detailed_engineering",
+    "engineering_review",
+    "procurement_fabrication",
+    "fat_shipping",
+    "retrofit_installation",
+    "commissioning_and_SAT",
+]
+
+
+@dataclass
+class QuoteInput:
+    """
+    Every value the five form tabs collect, with the widget defaults.
+    quote_date None means today. robot_type, robot_bases and gripper_type
+    map a model name to its quantity.
+    """
+    # Proposal Info
+    quote_date: Optional[datetime.date] = None
+    value_proposition: str = ""
+    client_name: str = ""
+    client_company: str = ""
+    salesman_name: str = ""
+    site_location: str = ""
+    shipping_method: str = "Truck"
+    num_trucks_or_containers: int = 1
+    currency: str = "USD"
+    application_overview: str = ""
+    # System Config
+    materials: List[str] = field(default_factory=list)
+    try_and_buy: bool = False
+    belt_speed: str = ""
+    pick_rate: str = ""
+    robot_type: Dict[str, int] = field(default_factory=dict)
+    robot_bases: Dict[str, int] = field(default_factory=dict)
+    gripper_type: Dict[str, int] = field(default_factory=dict)
+    add_backup_gripper: bool = False
+    backup_gripper: Optional[str] = None
+    # Technical Specs
+    max_object_weight: float = 0.0
+    disposition: str = "FTF"
+    vrs_model: str = "900"
+    vision_system: Dict[str, int] = field(default_factory=dict)
+    input_power_kva: float = 0.0
+    avg_consumption_kw: float = 0.0
+    air_consumption_lpm: int = 0
+    # Shipping & Timeline
+    order_confirmation_project_kickoff: str = ""
+    detailed_engineering: str = ""
+    engineering_review: str = ""
+    procurement_fabrication: str = ""
+    fat_shipping: str = ""
+    retrofit_installation: str = ""
+    commissioning_and_SAT: str = ""
+    # Inclusions & Quote
+    safety_fencing: bool = False
+    conveyor_var_speed_license: bool = False
+    custom_ai_training: bool = False
+    robot_validator_license: bool = False
+    greyparrot_monitoring_unit: bool = False
+    installation_supervision: bool = False
+    additional_sorting_recipes: bool = False
+    sat_to_cfa: bool = False
+    engineering_and_documentation: bool = False
+    online_commissioning: bool = False
+    installation_commissioning_training: bool = False
+    lips2_support: bool = False
+    warranty_option: str = "None"
+
+    @classmethod
+    def from_dict(cls, data):
+        """Build from a (possibly partial) dict; see quote_from_dict()."""
+        return cls(**quote_from_dict(data))
+
+    def as_dict(self):
+        """The complete quote dict the rendering functions take."""
+        return quote_from_dict({f.name: getattr(self, f.name) for f in fields(self)})
+
+
+# Every form field with the value its widget starts with.
+DEFAULT_FIELDS = {
+    f.name: f.default if f.default_factory is MISSING else f.default_factory()
+    for f in fields(QuoteInput)
+}
+
+
+def quote_from_dict(data):
+    """
+    Build a complete quote from a (possibly partial) dict such as a JSON
+    request. Missing fields take their form defaults; quote_date may be an
+    ISO date string.
+    """
+    unknown = set(data) - set(DEFAULT_FIELDS)
+    if unknown:
+        raise ValueError(f"Unknown quote fields: {', '.join(sorted(unknown))}")
+    quote = {
+        name: copy.copy(default) for name, default in DEFAULT_FIELDS.items()
+    }
+    quote.update(data)
+    quote_date = quote["quote_date"]
+    if quote_date is None:
+        quote["quote_date"] = datetime.date.today()
+    elif isinstance(quote_date, str):
+        quote["quote_date"] = datetime.date.fromisoformat(quote_date)
+    if not quote["add_backup_gripper"]:
+        quote["backup_gripper"] = None
+    return quote
+
+
+def missing_fields(quote):
+    """Return the labels of required fields left empty, in form order."""
+    missing = []
+
+    # Proposal Info
+    if not quote["value_proposition"].strip():
+        missing.append("Value Proposition")
+    if not quote["client_name"].strip():
+        missing.append("Client Name")
+    if not quote["client_company"].strip():
+        missing.append("Client Company Name")
+    if not quote["salesman_name"].strip():
+        missing.append("Salesperson Name")
+    if not quote["site_location"].strip():
+        missing.append("Site Location")
+    if not quote["application_overview"].strip():
+        missing.append("Application Overview")
+
+    # System Config
+    if not quote["materials"]:
+        missing.append("Materials to Sort")
+    if not quote["belt_speed"].strip():
+        missing.append("Belt Speed")
+    if not quote["pick_rate"].strip():
+        missing.append("Pick Rate")
+    if not quote["robot_type"]:
+        missing.append("Robot Type")
+    if not quote["gripper_type"]:
+        missing.append("Gripper Type")
+
+    # Technical Specs
+    if quote["max_object_weight"] == 0.0:
+        missing.append("Max Object Weight")
+    if quote["robot_bases"] == 0:
+        missing.append("Number of Robot Bases")
+    if not quote["vision_system"]:
+        missing.append("Vision System")
+    if quote["input_power_kva"] == 0.0:
+        missing.append("Input Power")
+    if quote["avg_consumption_kw"] == 0.0:
+        missing.append("Average Power Consumption")
+    if quote["air_consumption_lpm"] == 0:
+        missing.append("Air Consumption")
+
+    # Shipping & Timeline
+    # Shipping method/count validation
+    if not quote["site_location"].strip():
+        missing.append("Site Location")
+    if not quote["shipping_method"]:
+        missing.append("Shipping Method")
+    if not quote["num_trucks_or_containers"] or quote["num_trucks_or_containers"] < 1:
+        missing.append("Number of Trucks/Containers")
+    if not quote["order_confirmation_project_kickoff"].strip():
+        missing.append("Order Confirmation / Project Kickoff Duration")
+    if not quote["detailed_engineering"].strip():
+        missing.append("Detailed Engineering Duration")
+    if not quote["engineering_review"].strip():
+        missing.append("Engineering Review Duration")
+    if not quote["procurement_fabrication"].strip():
+        missing.append("Procurement and Fabrication Duration")
+    if not quote["fat_shipping"].strip():
+        missing.append("FAT and Shipping Duration")
+    if not quote["retrofit_installation"].strip():
+        missing.append("Retrofit and Installation Duration")
+    if not quote["commissioning_and_SAT"].strip():
+        missing.append("Commissioning and SAT Duration")
+
+    return missing
+
+
+def currency_multiplier(quote):
+    return float(CURRENCY_CONVERSION.get(quote["currency"], 1.0))
+
+
+def price_table(quote):
+    """Return (breakdown DataFrame, total) in the quote currency."""
+    import pandas as pd  # only needed once a quote is priced, not to render the form
+
+    df = pd.DataFrame(calculate_price_breakdown(quote))
+    multiplier = currency_multiplier(quote)
+    df["Unit Price"] = pd.to_numeric(df["Unit Price"], errors="coerce").fillna(0) * multiplier
+    df["Subtotal"] = pd.to_numeric(df["Subtotal"], errors="coerce").fillna(0) * multiplier
+    total = df["Subtotal"].sum()
+    return df, total
+
+
+def output_basename(quote):
+    """File name stem used for downloads, e.g. "Acme_Quote_20250101"."""
+    return f"{quote['client_name']}_Quote_{quote['quote_date'].strftime('%Y%m%d')}"
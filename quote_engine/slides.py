@@ -0,0 +1,1239 @@
+'''
+PowerPoint quote deck.
+
+build_presentation() assembles the eight-slide deck for a quote; each slide
+has its own add_*_slide() builder. Given the price breakdown table, as
+quote generation passes it unless QUOTE_RASTER_PRICE_TABLE is set, it also
+appends the breakdown on one or more slides of its own.
+
+Decks start from a branded template built once per process: the slide
+master carries the dark background, and each slide layout (see
+TEMPLATE_LAYOUTS) carries the logo, footer bar, watermark and whatever else
+of its slides never changes - headings, panels, the timeline's axis. Slide
+builders then only add the content that depends on the quote.
+'''
+import os
+import re
+import threading
+from io import BytesIO
+
+from pptx import Presentation
+from pptx.dml.color import RGBColor
+from pptx.opc.constants import RELATIONSHIP_TYPE as RT
+from pptx.oxml.ns import qn
+from pptx.util import Inches, Pt
+
+from quote_engine import tracing
+from quote_engine.images import sized_image
+from quote_engine.output import document_bytes
+from quote_engine.paths import resolve_path
+from quote_engine.price_table import add_pptx_price_table
+from quote_engine.pricing import load_catalog
+from quote_engine.store import image_info
+from quote_engine.textfit import fit_font_size
+
+# Colors and font
+BLUE = RGBColor(46, 125, 122)       # #2e7d7a
+LIGHT_BLUE = RGBColor(46, 125, 122)  # #2e7d7a
+WHITE = RGBColor(255, 255, 255)
+BLACK = RGBColor(12, 12, 12)
+RED = RGBColor(239, 58, 45)         # #EF3A2D
+FONT_NAME = "Arial"
+
+# Branding colors
+BRAND_RED = RGBColor(239, 58, 45)   # #EF3A2D
+BRAND_DARK = RGBColor(15, 15, 15)   # #0F0F0F
+
+
+def fit_text_to_box(frame, text, box_height_in, box_width_in, max_font=15, min_font=8):
+    """
+    Write `text` into `frame` as white Arial at the largest size from
+    max_font down to min_font that fits the box, measured with Arial's
+    metrics (see quote_engine.textfit) inside the frame's margins.
+    """
+    width_pt = box_width_in * 72 - (frame.margin_left + frame.margin_right) / 12700
+    height_pt = box_height_in * 72 - (frame.margin_top + frame.margin_bottom) / 12700
+    font_size = fit_font_size(text, width_pt, height_pt, max_size=max_font, min_size=min_font)
+    frame.clear()
+    frame.word_wrap = True
+    p = frame.paragraphs[0]
+    p.text = text
+    p.font.size = Pt(font_size)
+    p.font.color.rgb = RGBColor(255, 255, 255)
+    p.font.name = "Arial"
+
+
+def add_page_number(prs, slide, page_num, color=RGBColor(120, 120, 120)):
+    slide.shapes.add_textbox(
+        prs.slide_width - Inches(1.2),
+        prs.slide_height - Inches(0.5),
+        Inches(1),
+        Inches(0.3)
+    ).text_frame.text = f"{page_num}"
+    tf = slide.shapes[-1].text_frame
+    p = tf.paragraphs[0]
+    p.font.size = Pt(12)
+    p.font.color.rgb = color
+    p.font.name = FONT_NAME
+    p.alignment = 2  # Right
+
+
+def add_footer_bar(prs, slide, text="Waste Robotics", color=BLUE):
+    bar_height = Pt(4)
+    bar = slide.shapes.add_shape(
+        1,  # msoShapeRectangle
+        0,
+        prs.slide_height - bar_height,
+        prs.slide_width,
+        bar_height
+    )
+    bar.fill.solid()
+    bar.fill.fore_color.rgb = color
+    bar.line.width = Pt(0)
+    bar.line.fill.background()
+
+
+def add_watermark(prs, slide, logo_path="logo2.png"):
+    if os.path.exists(resolve_path(logo_path)):
+        slide.shapes.add_picture(
+            sized_image(logo_path, Inches(2), Inches(0.25)),
+            prs.slide_width - Inches(2.75),
+            prs.slide_height - Inches(0.5),
+            width=Inches(2),
+            height=Inches(0.25)
+        ).element.set('style', 'opacity:0.08')  # Note: python-pptx doesn't support opacity directly, but you can pre-make a transparent PNG.
+
+
+def add_branding(prs, slide):
+    # Add logo (top left)
+    slide.shapes.add_picture(sized_image("logo1.png", Inches(1.5)), Inches(0.2), Inches(0.2), width=Inches(1.5))
+
+
+def new_slide(prs, layout="Content"):
+    """Add a slide on one of the template's branded layouts."""
+    return prs.slides.add_slide(prs.slide_layouts.get_by_name(layout))
+
+
+def get_scaled_size(img_path, max_width_in, max_height_in):
+    info = image_info(img_path)
+    img_w, img_h = info.width, info.height
+    dpi = 96  # Assume 96 dpi for conversion
+    max_w_px = max_width_in * dpi
+    max_h_px = max_height_in * dpi
+    scale = min(max_w_px / img_w, max_h_px / img_h, 1.0)
+    return img_w * scale / dpi, img_h * scale / dpi  # return in inches
+
+
+def total_arms(quote):
+    robot_type = quote["robot_type"]
+    return sum(robot_type.values()) if robot_type else 0
+
+
+def extract_weeks(duration):
+    match = re.search(r"(\d+)", str(duration))
+    return int(match.group(1)) if match else 0
+
+
+# Title slide text column, left of the background image
+TITLE_LEFT = Inches(0.25)
+TITLE_TOP = Inches(1.2)
+TITLE_WIDTH = Inches(4.5)
+TITLE_HEIGHT = Inches(1.2)
+TITLE_LINE_TOP = TITLE_TOP + TITLE_HEIGHT + Inches(0.5)
+
+
+def draw_title_layout(prs, slide):
+    """Logo, background image and divider of the title slide."""
+    slide_width = prs.slide_width
+    slide_height = prs.slide_height
+    add_branding(prs, slide)
+
+    # Place the image so its left edge is at the center of the slide
+    bg_img_path = resolve_path("title_background.png")
+    if os.path.exists(bg_img_path):
+        info = image_info(bg_img_path)
+        img_width, img_height = info.width, info.height
+        slide_px_height = int(slide_height / 9525)
+        # Scale image to fit slide height
+        scale = slide_px_height / img_height
+        new_width = int(img_width * scale)
+        new_height = slide_px_height
+        # Place so left edge aligns with center of slide
+        left = int(slide_width / 2)
+        top = 0
+        slide.shapes.add_picture(
+            sized_image(bg_img_path, new_width * 9525, new_height * 9525),
+            left,
+            top,
+            width=new_width * 9525,
+            height=new_height * 9525
+        )
+
+    # Add a thin line above the info box
+    line_shape = slide.shapes.add_shape(
+        1,  # msoShapeRectangle
+        TITLE_LEFT,
+        TITLE_LINE_TOP,
+        TITLE_WIDTH,
+        Pt(2)
+    )
+    fill = line_shape.fill
+    fill.solid()
+    fill.fore_color.rgb = LIGHT_BLUE
+    line_shape.line.color.rgb = LIGHT_BLUE
+    line_shape.line.width = Pt(0)
+
+
+def add_title_slide(prs, quote):
+    """Title slide: value proposition, client and date beside the background image."""
+    slide = new_slide(prs, "Title")
+    value_proposition = quote["value_proposition"]
+    client_name = quote["client_name"]
+    client_company = quote["client_company"]
+    quote_date = quote["quote_date"]
+
+    # Title text on left half (never overlaps image)
+    title_shape = slide.shapes.add_textbox(TITLE_LEFT, TITLE_TOP, TITLE_WIDTH, TITLE_HEIGHT)
+    title_frame = title_shape.text_frame
+    title_frame.clear()
+    p = title_frame.add_paragraph()
+    p.text = f"Value Proposition: \n{value_proposition}"
+    p.font.size = Pt(30)
+    p.font.bold = False
+    p.font.color.rgb = LIGHT_BLUE
+    p.font.name = FONT_NAME
+
+    # Info box below the divider (also only left half)
+    info_shape = slide.shapes.add_textbox(TITLE_LEFT, TITLE_LINE_TOP + Inches(0.2), TITLE_WIDTH, Inches(2.25))
+    info_frame = info_shape.text_frame
+    info_frame.clear()
+    p = info_frame.add_paragraph()
+    p.text = f"Presented to: {client_name}\nCompany: {client_company}\n\n\n\n\n\nDate: {quote_date.strftime('%B %d, %Y')}"
+    p.font.size = Pt(20)
+    p.font.color.rgb = LIGHT_BLUE
+    p.font.name = FONT_NAME
+
+
+def draw_content_layout(prs, slide):
+    """Logo, footer bar and watermark shared by the content slides."""
+    add_branding(prs, slide)
+    add_footer_bar(prs, slide)
+    add_watermark(prs, slide)
+
+
+def add_overview_slide(prs, quote, layout):
+    """Application overview with the ISO layout render."""
+    slide = new_slide(prs)
+    application_overview = quote["application_overview"]
+    num_arms = total_arms(quote)
+
+    # Heading: Application Overview
+    heading_left = Inches(0.7)
+    heading_top = Inches(1.0)
+    heading_width = Inches(7)
+    heading_height = Inches(0.8)
+    heading_shape = slide.shapes.add_textbox(heading_left, heading_top, heading_width, heading_height)
+    heading_frame = heading_shape.text_frame
+    heading_frame.clear()
+    p = heading_frame.add_paragraph()
+    p.text = "Application Overview"
+    p.font.size = Pt(32)
+    p.font.bold = True
+    p.font.color.rgb = BLUE
+    p.font.name = FONT_NAME
+
+    # Overview text (white)
+    overview_left = heading_left
+    overview_top = heading_top + heading_height + Inches(0.1)
+    overview_width = Inches(7)
+    overview_height = Inches(1.2)
+    overview_shape = slide.shapes.add_textbox(overview_left, overview_top, overview_width, overview_height)
+    overview_frame = overview_shape.text_frame
+    overview_frame.clear()
+    p = overview_frame.add_paragraph()
+    p.text = application_overview
+    p.font.size = Pt(20)
+    p.font.color.rgb = WHITE
+    p.font.name = FONT_NAME
+
+    # "Preliminary layout design (#arm-system)" section
+    layout_label_left = heading_left
+    layout_label_top = overview_top + overview_height + Inches(0.2)
+    layout_label_width = Inches(7)
+    layout_label_height = Inches(0.5)
+    layout_label_shape = slide.shapes.add_textbox(layout_label_left, layout_label_top, layout_label_width, layout_label_height)
+    layout_label_frame = layout_label_shape.text_frame
+    layout_label_frame.clear()
+    p = layout_label_frame.add_paragraph()
+    p.text = f"Preliminary layout design ({num_arms}-arm system)"
+    p.font.size = Pt(22)
+    p.font.bold = True
+    p.font.color.rgb = BLUE
+    p.font.name = FONT_NAME
+
+    # ISO image centered below the label
+    iso_img_top = layout_label_top + layout_label_height + Inches(0.4)
+    iso_img_width = Inches(5)
+    iso_img_height = Inches(3)
+    iso_img_left = heading_left 
+
+    slide.shapes.add_picture(
+        sized_image(layout.iso_path, iso_img_width, iso_img_height),
+        iso_img_left,
+        iso_img_top,
+        width=iso_img_width,
+        height=iso_img_height
+    )
+    add_page_number(prs, slide, 1)
+
+
+def add_layout_slide(prs, quote, layout):
+    """Top and front layout views side by side."""
+    slide_width = prs.slide_width
+    slide = new_slide(prs)
+    num_arms = total_arms(quote)
+
+    # Title: Layout Overview (#arms-system)
+    layout_title = f"Layout Overview ({num_arms}-arm system)"
+    title_left = Inches(0.7)
+    title_top = Inches(1.0)
+    title_width = Inches(7)
+    title_height = Inches(0.8)
+    title_shape = slide.shapes.add_textbox(title_left, title_top, title_width, title_height)
+    title_frame = title_shape.text_frame
+    title_frame.clear()
+    p = title_frame.add_paragraph()
+    p.text = layout_title
+    p.font.size = Pt(32)
+    p.font.bold = True
+    p.font.color.rgb = RGBColor(46, 125, 122)  # #2e7d7a
+    p.font.name = "Arial"
+
+    # Arrange images side by side, centered, keeping natural proportions
+    top_path = layout.top_path
+    front_path = layout.front_path
+
+    max_img_width = Inches(4)
+    max_img_height = Inches(3)
+    spacing = Inches(0.5)
+
+    # Top view image (left)
+    top_w_in, top_h_in = get_scaled_size(top_path, 4, 3)
+    # Front view image (right)
+    front_w_in, front_h_in = get_scaled_size(front_path, 4, 3)
+
+    # Calculate total width for centering
+    total_width = Inches(top_w_in) + Inches(front_w_in) + spacing
+    img_top = title_top + title_height + Inches(0.3)
+    img_left = (slide_width - total_width) // 2
+
+    # Top view image (left)
+    slide.shapes.add_picture(
+        sized_image(top_path, Inches(top_w_in), Inches(top_h_in)),
+        img_left,
+        img_top,
+        width=Inches(top_w_in),
+        height=Inches(top_h_in)
+    )
+
+    # Front view image (right)
+    slide.shapes.add_picture(
+        sized_image(front_path, Inches(front_w_in), Inches(front_h_in)),
+        img_left + Inches(top_w_in) + spacing,
+        img_top,
+        width=Inches(front_w_in),
+        height=Inches(front_h_in)
+    )
+    add_page_number(prs, slide, 2)
+
+
+def add_models_slide(prs, quote, layout):
+    """Robot arm models (left) and gripper models (right)."""
+    slide = new_slide(prs)
+    robot_type = quote["robot_type"]
+    gripper_type = quote["gripper_type"]
+
+    # Layout parameters
+    margin_left = Inches(0.7)
+    margin_right = Inches(5)
+    title_top = Inches(1.0)
+    title_height = Inches(0.4)
+    gap_after_title = Inches(0.4)
+    img_top_start = title_top
+    img_width = Inches(3.0)
+    img_height = Inches(2.2)
+    img_spacing = Inches(0.3)
+
+    # --- Robot Arms (left column) ---
+    if robot_type:
+        for idx, (rtype, robot_arm_filename) in enumerate(zip(robot_type.keys(), layout.robot_images)):
+            # Title for each arm
+            arm_title_top = img_top_start + idx * (title_height + img_height + img_spacing)
+            arm_title_shape = slide.shapes.add_textbox(
+                margin_left,
+                arm_title_top,
+                img_width,
+                title_height
+            )
+            arm_title_frame = arm_title_shape.text_frame
+            arm_title_frame.clear()
+            p = arm_title_frame.add_paragraph()
+            p.text = f"Robot Arm Model: {rtype}"
+            p.font.size = Pt(18)
+            p.font.bold = True
+            p.font.color.rgb = BLUE
+            p.font.name = FONT_NAME
+
+            # Image for each arm
+            arm_img_top = arm_title_top + title_height + gap_after_title
+            slide.shapes.add_picture(
+                sized_image(robot_arm_filename, img_width, img_height),
+                margin_left + Inches(0.15),
+                arm_img_top,
+                width=img_width,
+                height=img_height
+            )
+
+    # --- Grippers (right column) ---
+    if gripper_type:
+        for idx, (gtype, gripper_filename) in enumerate(zip(gripper_type.keys(), layout.gripper_images)):
+            # Title for each gripper
+            gripper_title_top = img_top_start + idx * (title_height + img_height + img_spacing)
+            gripper_title_shape = slide.shapes.add_textbox(
+                margin_right - Inches(0.15),
+                gripper_title_top,
+                img_width,
+                title_height
+            )
+            gripper_title_frame = gripper_title_shape.text_frame
+            gripper_title_frame.clear()
+            p = gripper_title_frame.add_paragraph()
+            p.text = f"Gripper Model: {gtype}"
+            p.font.size = Pt(18)
+            p.font.bold = True
+            p.font.color.rgb = BLUE
+            p.font.name = FONT_NAME
+
+            # Image for each gripper
+            gripper_img_top = gripper_title_top + title_height + gap_after_title
+            slide.shapes.add_picture(
+                sized_image(gripper_filename, img_width, img_height),
+                margin_right,
+                gripper_img_top,
+                width=img_width,
+                height=img_height
+            )
+    add_page_number(prs, slide, 3)
+
+
+def draw_vision_layout(prs, slide):
+    """The vision system sensor fusion slide, which is all static content."""
+    slide_width = prs.slide_width
+    add_branding(prs, slide)
+
+    # --- Centered Main Title ---
+    main_title = "ROBOT VISION SYSTEM SENSOR FUSION"
+    main_title_width = Inches(8)
+    main_title_height = Inches(0.8)
+    main_title_left = (slide_width - main_title_width) // 2
+    main_title_top = Inches(1)
+    title_shape = slide.shapes.add_textbox(main_title_left, main_title_top, main_title_width, main_title_height)
+    title_frame = title_shape.text_frame
+    title_frame.clear()
+    p = title_frame.add_paragraph()
+    p.text = main_title
+    p.font.size = Pt(28)
+    p.font.bold = True
+    p.font.color.rgb = BLUE
+    p.font.name = FONT_NAME
+    title_frame.paragraphs[0].alignment = 1  # Center
+
+    # Add a thin vertical blue line down the middle below the title
+    line_width = Pt(2)
+    line_height = Inches(4.5)  # Adjust as needed for your layout
+    line_left = (slide_width // 2) - (line_width // 2) - Inches(0.55)
+    line_top = main_title_top + main_title_height + Inches(0.1)
+
+    line_shape = slide.shapes.add_shape(
+        1,  # msoShapeRectangle
+        line_left,
+        line_top,
+        line_width,
+        line_height
+    )
+    fill = line_shape.fill
+    fill.solid()
+    fill.fore_color.rgb = BLUE
+    line_shape.line.color.rgb = BLUE
+    line_shape.line.width = Pt(0)
+
+    # --- Left Section: Vision system image ---
+    vision_img_path = "vision_system.png"
+    vision_img_width = Inches(2.5)
+    vision_img_height = Inches(2)
+    vision_img_left = Inches(1.4)
+    vision_img_top = main_title_top + main_title_height + Inches(1.25)
+    slide.shapes.add_picture(
+        sized_image(vision_img_path, vision_img_width, vision_img_height),
+        vision_img_left,
+        vision_img_top,
+        width=vision_img_width,
+        height=vision_img_height
+    )
+
+    # Centered Deepvision label below the image
+    label_top = vision_img_top + vision_img_height + Inches(0.2)
+    label_shape = slide.shapes.add_textbox(
+        vision_img_left + Inches(0.6),
+        label_top - Inches(0.4),
+        vision_img_width,
+        Inches(0.4)
+    )
+    label_frame = label_shape.text_frame
+    label_frame.clear()
+    p = label_frame.add_paragraph()
+    p.text = "Deepvision"
+    p.font.size = Pt(16)
+    p.font.bold = False
+    p.font.color.rgb = WHITE
+    p.font.name = FONT_NAME
+    label_frame.paragraphs[0].alignment = 1  # Center
+
+    # --- Right Section: Vision comparison image ---
+    comparison_img_path = "vision_comparison.png"
+    comparison_img_width = Inches(3.75)
+    comparison_img_height = Inches(4)
+    comparison_img_left = Inches(5.0)
+    comparison_img_top = main_title_top + main_title_height + Inches(0.2)
+    slide.shapes.add_picture(
+        sized_image(comparison_img_path, comparison_img_width, comparison_img_height),
+        comparison_img_left,
+        comparison_img_top,
+        width=comparison_img_width,
+        height=comparison_img_height
+    )
+
+    # Centered section labels ("Color", "3d", "AI") beneath each third of the comparison image
+    section_titles = ["Color", "3d", "AI"]
+    section_width_each = comparison_img_width / 3
+    section_label_top = comparison_img_top + comparison_img_height + Inches(0.1)
+    for i, section in enumerate(section_titles):
+        section_left = comparison_img_left + section_width_each * i
+        section_shape = slide.shapes.add_textbox(
+            section_left  + Inches(0.25),
+            section_label_top - Inches(0.4),
+            section_width_each,
+            Inches(0.3)
+        )
+        section_frame = section_shape.text_frame
+        section_frame.clear()
+        p = section_frame.add_paragraph()
+        p.text = section
+        p.font.size = Pt(14)
+        p.font.bold = False
+        p.font.color.rgb = WHITE
+        p.font.name = FONT_NAME
+        section_frame.paragraphs[0].alignment = 1  # Center
+    add_footer_bar(prs, slide)
+    add_watermark(prs, slide)
+
+
+def add_vision_slide(prs):
+    """Vision system sensor fusion slide (static content, see draw_vision_layout)."""
+    slide = new_slide(prs, "Vision")
+    add_page_number(prs, slide, 4)
+
+
+def draw_two_column_layout(prs, slide):
+    """Black header bar with the full logo over the Inclusions/Exclusions panels."""
+    slide_width = prs.slide_width
+    slide_height = prs.slide_height
+
+    # --- Top black bar ---
+    bar_height = Inches(1.25)
+    bar_shape = slide.shapes.add_shape(
+        1,  # msoShapeRectangle
+        0, 0,
+        slide_width,
+        bar_height
+    )
+    bar_fill = bar_shape.fill
+    bar_fill.solid()
+    bar_fill.fore_color.rgb = BLACK
+    bar_shape.line.width = Pt(0)
+    bar_shape.line.fill.background()
+
+    # --- Logo on top left (over the black bar) ---
+    logo_path = resolve_path("logoWasteRobotics(1).png")
+    logo_width = Inches(1.5)
+    logo_height = Inches(0.8)
+    logo_left = Inches(0.2)
+    logo_top = Inches(0.1)
+    if os.path.exists(logo_path):
+        slide.shapes.add_picture(sized_image(logo_path, logo_width, logo_height), logo_left, logo_top, width=logo_width, height=logo_height)
+
+    # --- Section backgrounds start below the bar ---
+    half_width = slide_width // 2
+
+    # --- Left: Inclusions ---
+    inclusions_left = 0
+    inclusions_top = bar_height
+    inclusions_width = half_width
+    inclusions_height = slide_height - Inches(1.25)
+
+    # Blue background rectangle
+    left_bg = slide.shapes.add_shape(
+        1,  # msoShapeRectangle
+        inclusions_left,
+        inclusions_top,
+        inclusions_width,
+        inclusions_height
+    )
+    fill = left_bg.fill
+    fill.solid()
+    fill.fore_color.rgb = BLUE
+    left_bg.line.width = Pt(0)
+    left_bg.line.fill.background()
+
+    # Inclusions label
+    label_shape = slide.shapes.add_textbox(
+        Inches(0.5),
+        Inches(1.0),
+        Inches(3.5),
+        Inches(0.6)
+    )
+    label_frame = label_shape.text_frame
+    label_frame.clear()
+    p = label_frame.add_paragraph()
+    p.text = "Inclusions"
+    p.font.size = Pt(28)
+    p.font.bold = True
+    p.font.color.rgb = WHITE
+    p.font.name = FONT_NAME
+
+    # --- Right: Exclusions ---
+    exclusions_left = half_width
+    exclusions_top = bar_height
+    exclusions_width = half_width
+    exclusions_height = slide_height - Inches(1.25);
+
+    # Red background rectangle
+    right_bg = slide.shapes.add_shape(
+        1,  # msoShapeRectangle
+        exclusions_left,
+        exclusions_top,
+        exclusions_width,
+        exclusions_height
+    )
+    fill = right_bg.fill
+    fill.solid()
+    fill.fore_color.rgb = RED
+    right_bg.line.width = Pt(0)
+    right_bg.line.fill.background()
+    # Exclusions label
+    ex_label_shape = slide.shapes.add_textbox(
+        Inches(5.2),
+        Inches(1.0),
+        Inches(3.5),
+        Inches(0.6)
+    )
+    ex_label_frame = ex_label_shape.text_frame
+    ex_label_frame.clear()
+    p = ex_label_frame.add_paragraph()
+    p.text = "Exclusions"
+    p.font.size = Pt(28)
+    p.font.bold = True
+    p.font.color.rgb = WHITE
+    p.font.name = FONT_NAME
+
+
+def add_inclusions_slide(prs, quote):
+    """Inclusions (selected options) and exclusions."""
+    slide_height = prs.slide_height
+    slide = new_slide(prs, "Two Column")
+    robot_type = quote["robot_type"]
+    robot_bases = quote["robot_bases"]
+    gripper_type = quote["gripper_type"]
+    site_location = quote["site_location"]
+    warranty_option = quote["warranty_option"]
+    input_power_kva = quote["input_power_kva"]
+    avg_consumption_kw = quote["avg_consumption_kw"]
+    air_consumption_lpm = quote["air_consumption_lpm"]
+
+    # Build inclusions list
+    inclusions_list = []
+    # #arms of typeofarm
+    if robot_type:
+        for rtype, qty in robot_type.items():
+            inclusions_list.append(f"{qty} x {rtype} robot arm(s)")
+    # #robot bases
+    if robot_bases:
+        for btype, qty in robot_bases.items():
+            inclusions_list.append(f"{qty} x {btype} robot base(s)")
+    # # of grippers
+    if gripper_type:
+        for gtype, qty in gripper_type.items():
+            inclusions_list.append(f"{qty} x {gtype} gripper(s)")
+    # Shipping
+    inclusions_list.append(f"Shipping to {site_location}")
+
+    # All selected inclusions from tab 5
+    tab5_labels = [
+        ("safety_fencing", "Safety Fencing"),
+        ("conveyor_var_speed_license", "Conveyor Variable Speed License"),
+        ("custom_ai_training", "Custom AI Training"),
+        ("robot_validator_license", "Robot Validator License"),
+        ("greyparrot_monitoring_unit", "GreyParrot Monitoring Unit"),
+        ("installation_supervision", "Installation Supervision"),
+        ("additional_sorting_recipes", "Additional Sorting Recipes"),
+        ("sat_to_cfa", "SAT to CFA"),
+        ("engineering_and_documentation", "Engineering & Documentation"),
+        ("online_commissioning", "Online Commissioning"),
+        ("installation_commissioning_training", "Installation, Commissioning & Training"),
+        ("lips2_support", "LIPS2 Support"),
+        ("warranty_option", f"Warranty: {warranty_option}" if warranty_option != "None" else None)
+    ]
+    for key, label in tab5_labels:
+        if key == "warranty_option":
+            if warranty_option != "None":
+                inclusions_list.append(label)
+        elif quote.get(key):
+            inclusions_list.append(label)
+
+    # Inclusions list text box
+    inclusions_text = "\n".join(f"• {item}" for item in inclusions_list)
+    inclusions_box_left = Inches(0.5)
+    inclusions_box_top = Inches(1.7)
+    inclusions_box_width = Inches(3.8)
+    inclusions_box_height = slide_height - inclusions_box_top - Inches(0.3)  # leave a bottom margin
+    inclusions_box = slide.shapes.add_textbox(
+        inclusions_box_left,
+        inclusions_box_top,
+        inclusions_box_width,
+        inclusions_box_height
+    )
+    inclusions_frame = inclusions_box.text_frame
+    fit_text_to_box(
+        inclusions_frame,
+        inclusions_text,
+        inclusions_box_height / 914400,  # convert EMU to inches if needed, but Inches() returns EMU
+        inclusions_box_width / 914400
+    )
+
+    # Build exclusions list (not selected in tab 5)
+    exclusions_list = []
+    for key, label in tab5_labels:
+        if key == "warranty_option":
+            if warranty_option == "None":
+                exclusions_list.append("Warranty")
+        elif not quote.get(key):
+            exclusions_list.append(label)
+
+    # Always include these exclusions
+    exclusions_list += [
+        "All modifications required on current equipment to integrate the robotic system",
+        "Electrical hookup in client’s facility",
+        f"Total input power: {input_power_kva}kVA",
+        f"Average Power Consumption: {avg_consumption_kw}kW",
+        "Internet hookup in client’s facility (up/down 100 Mbits/sec)",
+        f"Compressed air hookup in client’s facility (total air consumption: {air_consumption_lpm}L/min)",
+        "Taxes, customs and/or duty charges"
+    ]
+
+    # Exclusions list text box
+    exclusions_text = "\n".join(f"• {item}" for item in exclusions_list)
+    exclusions_box_left = Inches(5.2)
+    exclusions_box_top = Inches(1.7)
+    exclusions_box_width = Inches(3.8)
+    exclusions_box_height = slide_height - exclusions_box_top - Inches(0.3)
+    exclusions_box = slide.shapes.add_textbox(
+        exclusions_box_left,
+        exclusions_box_top,
+        exclusions_box_width,
+        exclusions_box_height
+    )
+    exclusions_frame = exclusions_box.text_frame
+    fit_text_to_box(
+        exclusions_frame,
+        exclusions_text,
+        exclusions_box_height / 914400,
+        exclusions_box_width / 914400
+    )
+    add_page_number(prs, slide, 5)
+
+
+# Pricing slide sections
+PRICING_LEFT = Inches(0.7)
+PRICING_SPECS_TOP = Inches(1.2)
+PRICING_LINE_TOP = PRICING_SPECS_TOP + Inches(2.7)  # Just below specs section
+PRICING_PRICE_TOP = PRICING_LINE_TOP + Inches(0.2)
+
+
+def draw_pricing_layout(prs, slide):
+    """Headings, divider and disclaimer of the pricing slide."""
+    content_width = prs.slide_width - 2 * PRICING_LEFT
+    add_branding(prs, slide)
+
+    # --- System Specifications (top) ---
+    specs_label_shape = slide.shapes.add_textbox(
+        PRICING_LEFT,
+        PRICING_SPECS_TOP,
+        content_width,
+        Inches(0.5)
+    )
+    specs_label_frame = specs_label_shape.text_frame
+    specs_label_frame.clear()
+    p = specs_label_frame.add_paragraph()
+    p.text = "System Specifications"
+    p.font.size = Pt(22)
+    p.font.bold = True
+    p.font.color.rgb = BLUE
+    p.font.name = FONT_NAME
+
+    # --- Thin blue line between sections ---
+    line_shape = slide.shapes.add_shape(
+        1,  # msoShapeRectangle
+        PRICING_LEFT,
+        PRICING_LINE_TOP,
+        content_width,
+        Pt(2)
+    )
+    fill = line_shape.fill
+    fill.solid()
+    fill.fore_color.rgb = BLUE
+    line_shape.line.color.rgb = BLUE
+    line_shape.line.width = Pt(0)
+    line_shape.line.fill.background()
+
+    # --- Buying Price (below specs) ---
+    price_label_shape = slide.shapes.add_textbox(
+        PRICING_LEFT,
+        PRICING_PRICE_TOP,
+        content_width,
+        Inches(0.5)
+    )
+    price_label_frame = price_label_shape.text_frame
+    price_label_frame.clear()
+    p = price_label_frame.add_paragraph()
+    p.text = "Buying Price"
+    p.font.size = Pt(22)
+    p.font.bold = True
+    p.font.color.rgb = BLUE
+    p.font.name = FONT_NAME
+
+    # Disclaimer in small white font
+    disclaimer = "* Prices may vary due to exchange rates, inflation, and integration engineering. Valid for 30 days."
+    disclaimer_shape = slide.shapes.add_textbox(
+        PRICING_LEFT,
+        PRICING_PRICE_TOP + Inches(1.7),
+        content_width,
+        Inches(0.5)
+    )
+    disclaimer_frame = disclaimer_shape.text_frame
+    disclaimer_frame.clear()
+    p = disclaimer_frame.add_paragraph()
+    p.text = disclaimer
+    p.font.size = Pt(10)
+    p.font.color.rgb = WHITE
+    p.font.name = FONT_NAME
+    add_footer_bar(prs, slide)
+    add_watermark(prs, slide)
+
+
+def add_pricing_slide(prs, quote, total, multiplier):
+    """System specifications and buying price."""
+    slide = new_slide(prs, "Pricing")
+    pick_rate = quote["pick_rate"]
+    max_object_weight = quote["max_object_weight"]
+    currency = quote["currency"]
+    content_width = prs.slide_width - 2 * PRICING_LEFT
+
+    specs_content = (
+        f"Up to {pick_rate}\n"
+        f"Maximum Object Weight Per Robot: {max_object_weight} kg\n"
+        f"Robots operating conditions: 5°C to 45°C"
+    )
+    specs_content_shape = slide.shapes.add_textbox(
+        PRICING_LEFT,
+        PRICING_SPECS_TOP + Inches(0.6),
+        content_width,
+        Inches(1.0)
+    )
+    specs_content_frame = specs_content_shape.text_frame
+    specs_content_frame.clear()
+    p = specs_content_frame.add_paragraph()
+    p.text = specs_content
+    p.font.size = Pt(16)
+    p.font.color.rgb = WHITE
+    p.font.name = FONT_NAME
+
+    additional_arm_price = load_catalog().price("try_and_buy_arm") * multiplier
+    price_content = (
+        f"Robotic Sorting System: {currency} {total:,.0f}\n"
+        f"Additional Robot Arm: {currency} {additional_arm_price:,.0f}"
+    )
+    price_content_shape = slide.shapes.add_textbox(
+        PRICING_LEFT,
+        PRICING_PRICE_TOP + Inches(0.6),
+        content_width,
+        Inches(1.0)
+    )
+    price_content_frame = price_content_shape.text_frame
+    price_content_frame.clear()
+    p = price_content_frame.add_paragraph()
+    p.text = price_content
+    p.font.size = Pt(16)
+    p.font.color.rgb = WHITE
+    p.font.name = FONT_NAME
+    add_page_number(prs, slide, 6)
+
+
+# Timeline steps as (label, quote field)
+TIMELINE_STEPS = [
+    ("Project Kickoff", "order_confirmation_project_kickoff"),
+    ("Detailed Engineering", "detailed_engineering"),
+    ("Engineering Review", "engineering_review"),
+    ("Procurement & Fabrication", "procurement_fabrication"),
+    ("FAT & Shipping", "fat_shipping"),
+    ("Retrofit & Installation", "retrofit_installation"),
+    ("Commissioning \n & SAT", "commissioning_and_SAT"),
+]
+
+# Timeline geometry
+TIMELINE_LEFT = Inches(1.0)
+TIMELINE_TOP = Inches(3.0)
+TIMELINE_HEIGHT = Pt(3)
+CIRCLE_RADIUS = Pt(14)
+DURATION_BOX_WIDTH = Inches(1.0)
+DURATION_BOX_HEIGHT = Inches(0.3)
+DURATION_ROW_TOP = TIMELINE_TOP + Inches(1.0)
+LINE_BELOW_TOP = DURATION_ROW_TOP + DURATION_BOX_HEIGHT + Inches(0.5)
+DELIVERY_TOP = LINE_BELOW_TOP + Inches(0.3)
+DELIVERY_HEIGHT = Inches(0.4)
+
+
+def timeline_points(prs):
+    """(x, y) of each timeline step's circle: its center and top edge."""
+    timeline_width = prs.slide_width - Inches(1.0) - TIMELINE_LEFT
+    y = TIMELINE_TOP + TIMELINE_HEIGHT / 2 - CIRCLE_RADIUS / 2
+    return [
+        (TIMELINE_LEFT + i * (timeline_width / (len(TIMELINE_STEPS) - 1)), y)
+        for i in range(len(TIMELINE_STEPS))
+    ]
+
+
+def draw_timeline_layout(prs, slide):
+    """Timeline axis with its steps, divider and disclaimer."""
+    timeline_width = prs.slide_width - Inches(1.0) - TIMELINE_LEFT
+    add_branding(prs, slide)
+
+    # Draw timeline line
+    line_shape = slide.shapes.add_shape(
+        1,  # msoShapeRectangle
+        TIMELINE_LEFT,
+        TIMELINE_TOP,
+        timeline_width,
+        TIMELINE_HEIGHT
+    )
+    fill = line_shape.fill
+    fill.solid()
+    fill.fore_color.rgb = BLUE
+    line_shape.line.color.rgb = BLUE
+    line_shape.line.width = Pt(0)
+
+    label_box_height = Inches(0.4)
+    label_box_width = Inches(1.4)
+    connector_length = Inches(0.7)
+    connector_width = Pt(2)
+
+    for i, ((label, _), (x, y)) in enumerate(zip(TIMELINE_STEPS, timeline_points(prs))):
+        # Draw circle
+        circle = slide.shapes.add_shape(
+            9,  # msoShapeOval
+            x - CIRCLE_RADIUS / 2,
+            y,
+            CIRCLE_RADIUS,
+            CIRCLE_RADIUS
+        )
+        circle.fill.solid()
+        circle.fill.fore_color.rgb = BLUE
+        circle.line.color.rgb = WHITE
+        circle.line.width = Pt(2)
+
+        # Alternate connector direction and label position
+        if i % 2 == 0:
+            # Upwards connector, label above it
+            connector_top = y - connector_length
+            label_top = connector_top - label_box_height - Inches(0.25)
+        else:
+            # Downwards connector, label below it
+            connector_top = y + CIRCLE_RADIUS
+            label_top = connector_top + connector_length - Inches(0.25)
+        connector = slide.shapes.add_shape(
+            1,  # msoShapeRectangle
+            x - connector_width / 2,
+            connector_top,
+            connector_width,
+            connector_length
+        )
+        connector.fill.solid()
+        connector.fill.fore_color.rgb = BLUE
+        connector.line.color.rgb = BLUE
+        connector.line.width = Pt(0)
+        connector.line.fill.background()
+
+        label_shape = slide.shapes.add_textbox(
+            x - label_box_width / 2,
+            label_top,
+            label_box_width,
+            label_box_height
+        )
+        label_frame = label_shape.text_frame
+        label_frame.clear()
+        p = label_frame.add_paragraph()
+        p.text = label
+        p.font.size = Pt(14)
+        p.font.bold = True
+        p.font.color.rgb = WHITE
+        p.font.name = FONT_NAME
+        label_frame.paragraphs[0].alignment = 1  # Center
+
+    # --- Thin line beneath the timeline and durations ---
+    line_below = slide.shapes.add_shape(
+        1,  # msoShapeRectangle
+        TIMELINE_LEFT - Inches(0.75),
+        LINE_BELOW_TOP,
+        timeline_width + Inches(1.5),
+        Pt(2)
+    )
+    fill = line_below.fill
+    fill.solid()
+    fill.fore_color.rgb = BLUE
+    line_below.line.color.rgb = BLUE
+    line_below.line.width = Pt(0)
+    line_below.line.fill.background()
+
+    # Disclaimer below the delivery time
+    disclaimer_shape = slide.shapes.add_textbox(
+        TIMELINE_LEFT,
+        DELIVERY_TOP + DELIVERY_HEIGHT,
+        timeline_width,
+        Inches(0.3)
+    )
+    disclaimer_frame = disclaimer_shape.text_frame
+    disclaimer_frame.clear()
+    p = disclaimer_frame.add_paragraph()
+    p.text = "(to be confirmed at order time)"
+    p.font.size = Pt(12)
+    p.font.color.rgb = WHITE
+    p.font.name = FONT_NAME
+    disclaimer_frame.paragraphs[0].alignment = 1  # Center
+    add_footer_bar(prs, slide)
+    add_watermark(prs, slide)
+
+
+def add_timeline_slide(prs, quote):
+    """Project timeline and total delivery time."""
+    slide = new_slide(prs, "Timeline")
+    timeline_width = prs.slide_width - Inches(1.0) - TIMELINE_LEFT
+    durations = [quote[field] for _, field in TIMELINE_STEPS]
+
+    for i, (duration, (x, y)) in enumerate(zip(durations, timeline_points(prs))):
+        if i % 2 == 0:
+            # Duration just below the circle
+            duration_top = y + CIRCLE_RADIUS - Inches(0.25)
+        else:
+            # Duration just above the circle
+            duration_top = y - DURATION_BOX_HEIGHT - Inches(0.25)
+        duration_shape = slide.shapes.add_textbox(
+            x - DURATION_BOX_WIDTH / 2,
+            duration_top,
+            DURATION_BOX_WIDTH,
+            DURATION_BOX_HEIGHT
+        )
+        duration_frame = duration_shape.text_frame
+        duration_frame.clear()
+        p = duration_frame.add_paragraph()
+        p.text = duration
+        p.font.size = Pt(12)
+        p.font.color.rgb = BLUE
+        p.font.name = FONT_NAME
+        duration_frame.paragraphs[0].alignment = 1  # Center
+
+    # --- Delivery section ---
+    # Calculate total weeks (sum numbers in durations)
+    total_weeks = sum(extract_weeks(d) for d in durations)
+
+    # "Delivery:" label and total weeks
+    delivery_shape = slide.shapes.add_textbox(
+        TIMELINE_LEFT,
+        DELIVERY_TOP,
+        timeline_width,
+        DELIVERY_HEIGHT
+    )
+    delivery_frame = delivery_shape.text_frame
+    delivery_frame.clear()
+    p = delivery_frame.add_paragraph()
+    p.text = f"Delivery: {total_weeks} weeks"
+    p.font.size = Pt(18)
+    p.font.bold = True
+    p.font.color.rgb = WHITE
+    p.font.name = FONT_NAME
+    delivery_frame.paragraphs[0].alignment = 1  # Center
+    add_page_number(prs, slide, 7)
+
+
+# Price breakdown table: rows that don't fit above the page number continue
+# on further slides, each with its own header row.
+BREAKDOWN_TOP = Inches(1.9)
+BREAKDOWN_BOTTOM = Inches(0.6)
+BREAKDOWN_ROW_HEIGHT = Inches(0.3)
+
+
+def add_breakdown_slide(prs, quote, df, page_num=8):
+    """Line-item price breakdown as a native table, over as many slides as it needs."""
+    left_margin = Inches(0.7)
+    content_width = prs.slide_width - 2 * left_margin
+    available = prs.slide_height - BREAKDOWN_TOP - BREAKDOWN_BOTTOM
+    rows_per_slide = max(1, int(available / BREAKDOWN_ROW_HEIGHT) - 1)  # less the header row
+
+    for page, start in enumerate(range(0, max(len(df), 1), rows_per_slide)):
+        slide = new_slide(prs)
+        title_shape = slide.shapes.add_textbox(left_margin, Inches(1.2), content_width, Inches(0.5))
+        title_frame = title_shape.text_frame
+        title_frame.clear()
+        p = title_frame.add_paragraph()
+        p.text = "Price Breakdown" if page == 0 else "Price Breakdown (continued)"
+        p.font.size = Pt(22)
+        p.font.bold = True
+        p.font.color.rgb = BLUE
+        p.font.name = FONT_NAME
+
+        add_pptx_price_table(
+            slide, df.iloc[start:start + rows_per_slide], quote["currency"],
+            left=left_margin, top=BREAKDOWN_TOP, width=content_width, row_height=BREAKDOWN_ROW_HEIGHT,
+        )
+        add_page_number(prs, slide, page_num + page)
+
+
+# Slide layouts of the branded template, as (name, function drawing the
+# layout's shapes). Slides pick theirs by name in new_slide().
+TEMPLATE_LAYOUTS = [
+    ("Title", draw_title_layout),
+    ("Content", draw_content_layout),
+    ("Two Column", draw_two_column_layout),
+    ("Vision", draw_vision_layout),
+    ("Timeline", draw_timeline_layout),
+    ("Pricing", draw_pricing_layout),
+]
+
+# Images drawn into the template; it is rebuilt when one of them changes.
+TEMPLATE_IMAGES = [
+    "logo1.png", "logo2.png", "logoWasteRobotics(1).png", "title_background.png",
+    "vision_system.png", "vision_comparison.png",
+]
+
+_template = None  # (stamp, pptx bytes)
+_template_lock = threading.Lock()
+
+
+def _move_shapes(slide, layout):
+    # python-pptx can't add shapes to a layout, so they are drawn on a scratch
+    # slide and moved over, re-pointing pictures at the layout's relationships.
+    for element in list(slide.shapes._spTree.iter_shape_elms()):
+        for blip in element.iter(qn("a:blip")):
+            image_part = slide.part.related_part(blip.get(qn("r:embed")))
+            blip.set(qn("r:embed"), layout.part.relate_to(image_part, RT.IMAGE))
+        layout.shapes._spTree.append(element)
+
+
+def _drop_slide(prs, slide):
+    sld_ids = prs.slides._sldIdLst
+    for sld_id in list(sld_ids):
+        if prs.part.related_part(sld_id.rId) is slide.part:
+            prs.part.drop_rel(sld_id.rId)
+            sld_ids.remove(sld_id)
+
+
+def build_template():
+    """
+    The branded template as .pptx bytes: the default template's master with
+    the brand background, and its layouts replaced by TEMPLATE_LAYOUTS.
+    """
+    prs = Presentation()
+    fill = prs.slide_master.background.fill
+    fill.solid()
+    fill.fore_color.rgb = BRAND_DARK
+
+    layouts = list(prs.slide_layouts)
+    for layout, (name, draw) in zip(layouts, TEMPLATE_LAYOUTS):
+        layout._element.cSld.set("name", name)
+        for shape in list(layout.shapes):
+            layout.shapes._spTree.remove(shape._element)
+        scratch = prs.slides.add_slide(layout)
+        draw(prs, scratch)
+        _move_shapes(scratch, layout)
+        _drop_slide(prs, scratch)
+    for layout in layouts[len(TEMPLATE_LAYOUTS):]:
+        prs.slide_layouts.remove(layout)
+    return document_bytes(prs)
+
+
+def _template_stamp():
+    stamp = []
+    for name in TEMPLATE_IMAGES:
+        try:
+            st = os.stat(resolve_path(name))
+        except OSError:
+            stamp.append(None)
+        else:
+            stamp.append((st.st_mtime_ns, st.st_size))
+    return tuple(stamp)
+
+
+def template_bytes():
+    """The cached branded template, rebuilt only when its images change."""
+    global _template
+    stamp = _template_stamp()
+    cached = _template
+    if cached is None or cached[0] != stamp:
+        with _template_lock:
+            cached = _template
+            if cached is None or cached[0] != stamp:
+                cached = _template = (stamp, build_template())
+    return cached[1]
+
+
+def preload_template():
+    """Build the branded template now rather than for the first deck."""
+    template_bytes()
+
+
+def build_presentation(quote, layout, total, multiplier, df=None, on_slide=None):
+    """
+    Build the eight-slide quote deck. `total` is already converted to the
+    quote currency. Passing the breakdown `df` (in the quote currency), as
+    quote generation does by default, appends it as a native table on one or
+    more further slides.
+    `on_slide(done, count)` is called after each slide is added.
+    """
+    builders = [
+        ("title", lambda: add_title_slide(prs, quote)),
+        ("overview", lambda: add_overview_slide(prs, quote, layout)),
+        ("layout", lambda: add_layout_slide(prs, quote, layout)),
+        ("models", lambda: add_models_slide(prs, quote, layout)),
+        ("vision", lambda: add_vision_slide(prs)),
+        ("inclusions", lambda: add_inclusions_slide(prs, quote)),
+        ("pricing", lambda: add_pricing_slide(prs, quote, total, multiplier)),
+        ("timeline", lambda: add_timeline_slide(prs, quote)),
+    ]
+    if df is not None:
+        builders.append(("breakdown", lambda: add_breakdown_slide(prs, quote, df)))
+    with tracing.span("pptx.template"):
+        prs = Presentation(BytesIO(template_bytes()))
+    for done, (name, build) in enumerate(builders, 1):
+        with tracing.span(f"pptx.slide.{name}"):
+            build()
+        if on_slide is not None:
+            on_slide(done, len(builders))
+    return prs
@@ -0,0 +1,80 @@
+'''
+Content-addressed store for image assets.
+
+Several shipped images are byte-identical under different names (e.g.
+gripper_default.png and gripper_dagr.png, and top/front views shared by
+gripper variants of one layout). The store keys image bytes by sha256, so
+each unique image is read and held in memory once however many names point
+at it. Everything downstream (pre-sized derivatives, document media) is
+keyed by that digest too, so it is also decoded and resized once.
+
+Digests and image metadata (image_info()) come from the asset manifest;
+files outside it are read on first use and again only when their stat stamp
+changes. Bytes come from the packed asset bundle when it has them,
+otherwise from the file.
+'''
+import os
+import threading
+
+from quote_engine.bundle import get_bundle
+from quote_engine.manifest import get_manifest, read_image_info
+from quote_engine.paths import resolve_path
+
+_blobs = {}    # sha256 -> bytes
+_infos = {}  # path -> ((mtime_ns, size), ImageInfo) for files outside the manifest
+_lock = threading.Lock()
+
+
+def _read_file(path):
+    with open(path, "rb") as f:
+        return f.read()
+
+
+def image_info(path):
+    """
+    manifest.ImageInfo (pixel size, DPI, byte size, sha256) of an image file.
+    The file is only opened if it is outside the manifest and unseen or
+    changed since.
+    """
+    path = resolve_path(path)
+    info = get_manifest().info(path)
+    if info is not None:
+        return info
+    st = os.stat(path)
+    stamp = (st.st_mtime_ns, st.st_size)
+    cached = _infos.get(path)
+    if cached is not None and cached[0] == stamp:
+        return cached[1]
+    data = _read_file(path)
+    info = read_image_info(path, data)
+    _infos[path] = (stamp, info)
+    with _lock:
+        _blobs.setdefault(info.sha256, data)
+    return info
+
+
+def digest(path):
+    """sha256 of an image file's contents."""
+    return image_info(path).sha256
+
+
+def read(path):
+    """Bytes of an image, read from disk only the first time its content is seen."""
+    path = resolve_path(path)
+    key = digest(path)
+    data = _blobs.get(key)
+    if data is None:
+        bundle = get_bundle()
+        data = bundle.blob(key) if bundle is not None else None
+        if data is None:
+            data = _read_file(path)
+        with _lock:
+            data = _blobs.setdefault(key, data)
+    return data
+
+
+def preload():
+    """Load every unique image in the asset manifest into memory."""
+    for info in get_manifest().images.values():
+        if info.sha256 not in _blobs:
+            read(info.path)
@@ -0,0 +1,117 @@
+'''
+Text fitting for slide text boxes.
+
+fit_font_size() finds the largest font size at which a text wraps into a box,
+measuring words with Arial's advance widths. When an Arial (or the
+metric-compatible Liberation Sans) TrueType file is available, widths come
+from the font itself through PIL; otherwise from ARIAL_WIDTHS, the standard
+widths Arial shares with Helvetica. Words are measured once in font units
+(1/1000 em) and paragraphs' wrapped line counts per box width are cached,
+so repeated bullets cost a lookup; sizes are binary searched instead of
+tried one by one.
+'''
+import functools
+import math
+import os
+
+# Advance widths in 1/1000 em for ASCII 32-126.
+_ASCII_WIDTHS = [
+    278, 278, 355, 556, 556, 889, 667, 191, 333, 333, 389, 584, 278, 333, 278, 278,  # space - /
+    556, 556, 556, 556, 556, 556, 556, 556, 556, 556, 278, 278, 584, 584, 584, 556,  # 0 - ?
+    1015, 667, 667, 722, 722, 667, 611, 778, 722, 278, 500, 667, 556, 833, 722, 778,  # @ - O
+    667, 778, 722, 667, 611, 722, 667, 944, 667, 667, 611, 278, 278, 278, 469, 556,  # P - _
+    333, 556, 556, 500, 556, 556, 278, 556, 556, 222, 222, 500, 222, 833, 556, 556,  # ` - o
+    556, 556, 333, 500, 278, 556, 500, 722, 500, 500, 500, 334, 260, 334, 584,  # p - ~
+]
+ARIAL_WIDTHS = {chr(32 + i): width for i, width in enumerate(_ASCII_WIDTHS)}
+ARIAL_WIDTHS.update({
+    "\u2022": 350, "\u2018": 222, "\u2019": 222, "\u201c": 333, "\u201d": 333, "\u2013": 556, "\u2014": 1000,
+    "\u00b0": 400, "\u00d7": 584, "\u00e0": 556, "\u00e2": 556, "\u00e7": 500, "\u00e8": 556, "\u00e9": 556,
+    "\u00ea": 556, "\u00eb": 556, "\u00ee": 278, "\u00f4": 556, "\u00fb": 556, "\u00c9": 667, "\u20ac": 556,
+})
+DEFAULT_WIDTH = 556
+
+# Single line spacing as a multiple of the font size.
+LINE_SPACING = 1.2
+
+# Where to look for a real Arial; QUOTE_FONT_PATH takes precedence.
+FONT_CANDIDATES = [
+    "C:/Windows/Fonts/arial.ttf",
+    "/Library/Fonts/Arial.ttf",
+    "/System/Library/Fonts/Supplemental/Arial.ttf",
+    "/usr/share/fonts/truetype/msttcorefonts/Arial.ttf",
+    "/usr/share/fonts/truetype/liberation/LiberationSans-Regular.ttf",
+    "/usr/share/fonts/liberation/LiberationSans-Regular.ttf",
+]
+
+
+@functools.lru_cache(maxsize=1)
+def _font():
+    paths = [os.environ.get("QUOTE_FONT_PATH")] + FONT_CANDIDATES
+    for path in paths:
+        if path and os.path.exists(path):
+            try:
+                from PIL import ImageFont
+
+                return ImageFont.truetype(path, 1000)
+            except (ImportError, OSError):
+                continue
+    return None
+
+
+@functools.lru_cache(maxsize=8192)
+def word_units(word):
+    """Width of a word in 1/1000 em."""
+    font = _font()
+    if font is not None:
+        return font.getlength(word)
+    return sum(ARIAL_WIDTHS.get(char, DEFAULT_WIDTH) for char in word)
+
+
+@functools.lru_cache(maxsize=8192)
+def paragraph_lines(paragraph, limit):
+    """Lines one paragraph wraps to in a box `limit` font units wide."""
+    if word_units(paragraph) <= limit:
+        return 1
+    space = word_units(" ")
+    lines = 1
+    used = 0.0
+    for word in paragraph.split(" "):
+        units = word_units(word)
+        if units > limit:
+            # A word longer than the line is broken across lines.
+            extra = math.ceil(units / limit) - 1
+            lines += extra + (1 if used else 0)
+            used = units - extra * limit
+        elif used and used + space + units > limit:
+            lines += 1
+            used = units
+        else:
+            used += (space if used else 0) + units
+    return lines
+
+
+def count_lines(text, size, width):
+    """Lines `text` wraps to in a box `width` points wide, breaking at spaces."""
+    limit = width * 1000 / size  # box width in font units at this size
+    return sum(paragraph_lines(paragraph, limit) for paragraph in text.split("\n"))
+
+
+def fits(text, size, width, height):
+    """Whether `text` at `size` fits a box of `width` x `height` points."""
+    return count_lines(text, size, width) * size * LINE_SPACING <= height
+
+
+def fit_font_size(text, width, height, max_size=15, min_size=8):
+    """
+    Largest whole font size in [min_size, max_size] at which `text` fits a
+    `width` x `height` points box; min_size if none does.
+    """
+    low, high = min_size, max_size
+    while low < high:
+        mid = (low + high + 1) // 2
+        if fits(text, mid, width, height):
+            low = mid
+        else:
+            high = mid - 1
+    return low
@@ -0,0 +1,252 @@
+'''
+Per-stage timing of quote generation.
+
+    with tracing.span("docx.save") as sp:
+        data = document_bytes(doc)
+        sp.bytes = len(data)
+
+Each span records its wall time, the CPU time of the thread running it and
+the bytes it produced. Spans nest: a span opened inside another (including
+in a pool task submitted with bind()) shares its trace id, so one quote's
+stages can be pulled out of the log together.
+
+Finished spans are:
+
+- logged as one JSON object per line to the "quote_engine.trace" logger.
+  Set QUOTE_TRACE_LOG to a file path, or "-" for stderr, to have them
+  written without configuring logging yourself.
+- aggregated per stage into Prometheus text (metrics_text()): a wall time
+  histogram, p50/p95 of wall and CPU time over the last QUOTE_TRACE_WINDOW
+  spans, and byte and error counters. QUOTE_METRICS_FILE rewrites that file
+  whenever a top-level span ends; QUOTE_METRICS_PORT serves it at
+  http://127.0.0.1:<port>/metrics.
+
+Spans run in QUOTE_GENERATION_POOL=process workers are logged by the worker
+but counted in its own metrics, not the server's.
+'''
+import contextvars
+import functools
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import uuid
+from collections import deque
+from contextlib import contextmanager
+
+TRACE_LOG = os.environ.get("QUOTE_TRACE_LOG", "")
+TRACE_WINDOW = int(os.environ.get("QUOTE_TRACE_WINDOW", "1000"))
+METRICS_FILE = os.environ.get("QUOTE_METRICS_FILE") or None
+METRICS_PORT = int(os.environ.get("QUOTE_METRICS_PORT", "0"))
+
+# Upper bounds in seconds of the wall time histogram buckets.
+BUCKETS = (0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUANTILES = (0.5, 0.95)
+
+logger = logging.getLogger("quote_engine.trace")
+if TRACE_LOG:
+    _handler = logging.StreamHandler(sys.stderr) if TRACE_LOG == "-" else logging.FileHandler(TRACE_LOG)
+    _handler.setFormatter(logging.Formatter("%(message)s"))
+    logger.addHandler(_handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+_current = contextvars.ContextVar("quote_engine_span", default=None)
+_stats = {}  # stage -> _StageStats
+_lock = threading.Lock()
+_server = None
+
+
+class Span:
+    """One timed stage. Set `bytes` to the size of what it produced."""
+
+    def __init__(self, stage, parent, attrs):
+        self.stage = stage
+        self.id = uuid.uuid4().hex[:16]
+        self.trace = parent.trace if parent is not None else uuid.uuid4().hex
+        self.parent = parent.id if parent is not None else None
+        self.attrs = attrs
+        self.bytes = 0
+        self.wall = self.cpu = 0.0
+
+
+class _StageStats:
+    def __init__(self):
+        self.count = 0
+        self.errors = 0
+        self.wall_sum = 0.0
+        self.cpu_sum = 0.0
+        self.bytes = 0
+        self.buckets = [0] * len(BUCKETS)
+        self.recent_wall = deque(maxlen=TRACE_WINDOW)
+        self.recent_cpu = deque(maxlen=TRACE_WINDOW)
+
+    def add(self, span, failed):
+        self.count += 1
+        self.errors += failed
+        self.wall_sum += span.wall
+        self.cpu_sum += span.cpu
+        self.bytes += span.bytes
+        for i, bound in enumerate(BUCKETS):
+            if span.wall <= bound:
+                self.buckets[i] += 1
+        self.recent_wall.append(span.wall)
+        self.recent_cpu.append(span.cpu)
+
+    def copy(self):
+        other = _StageStats()
+        other.__dict__.update(self.__dict__)
+        other.buckets = list(self.buckets)
+        other.recent_wall = list(self.recent_wall)
+        other.recent_cpu = list(self.recent_cpu)
+        return other
+
+
+@contextmanager
+def span(stage, **attrs):
+    """Time the enclosed block as `stage`; extra keyword arguments are logged with it."""
+    parent = _current.get()
+    sp = Span(stage, parent, attrs)
+    token = _current.set(sp)
+    started = time.time()
+    wall = time.perf_counter()
+    cpu = time.thread_time()
+    failed = False
+    try:
+        yield sp
+    except BaseException:
+        failed = True
+        raise
+    finally:
+        sp.wall = time.perf_counter() - wall
+        sp.cpu = time.thread_time() - cpu
+        _current.reset(token)
+        _record(sp, started, failed)
+
+
+def bind(fn):
+    """`fn` wrapped to run in the current trace context, for pool.submit()."""
+    return functools.partial(contextvars.copy_context().run, fn)
+
+
+def _record(sp, started, failed):
+    with _lock:
+        stats = _stats.get(sp.stage)
+        if stats is None:
+            stats = _stats[sp.stage] = _StageStats()
+        stats.add(sp, failed)
+    if logger.isEnabledFor(logging.INFO):
+        record = {
+            "ts": round(started, 6),
+            "trace": sp.trace,
+            "span": sp.id,
+            "parent": sp.parent,
+            "stage": sp.stage,
+            "wall_ms": round(sp.wall * 1000, 3),
+            "cpu_ms": round(sp.cpu * 1000, 3),
+            "bytes": sp.bytes,
+            "ok": not failed,
+        }
+        record.update(sp.attrs)
+        logger.info(json.dumps(record, default=str))
+    if sp.parent is None:
+        if METRICS_FILE:
+            write_metrics(METRICS_FILE)
+        if METRICS_PORT and _server is None:
+            serve_metrics(METRICS_PORT)
+
+
+def _quantile(values, q):
+    # Nearest rank.
+    ordered = sorted(values)
+    if not ordered:
+        return 0.0
+    return ordered[min(len(ordered) - 1, max(0, int(q * len(ordered) + 0.5) - 1))]
+
+
+def metrics_text():
+    """Prometheus text exposition of the per-stage metrics."""
+    with _lock:
+        snapshot = [(stage, stats.copy()) for stage, stats in sorted(_stats.items())]
+    lines = [
+        "# HELP quote_stage_wall_seconds Wall time of quote generation stages.",
+        "# TYPE quote_stage_wall_seconds histogram",
+    ]
+    for stage, s in snapshot:
+        for bound, n in zip(BUCKETS, s.buckets):
+            lines.append(f'quote_stage_wall_seconds_bucket{{stage="{stage}",le="{bound}"}} {n}')
+        lines.append(f'quote_stage_wall_seconds_bucket{{stage="{stage}",le="+Inf"}} {s.count}')
+        lines.append(f'quote_stage_wall_seconds_sum{{stage="{stage}"}} {s.wall_sum!r}')
+        lines.append(f'quote_stage_wall_seconds_count{{stage="{stage}"}} {s.count}')
+    for name, label in (("wall", "Wall"), ("cpu", "CPU")):
+        metric = f"quote_stage_recent_{name}_seconds"
+        lines.append(f"# HELP {metric} {label} time quantiles over the last {TRACE_WINDOW} spans of each stage.")
+        lines.append(f"# TYPE {metric} summary")
+        for stage, s in snapshot:
+            recent = getattr(s, f"recent_{name}")
+            for q in QUANTILES:
+                lines.append(f'{metric}{{stage="{stage}",quantile="{q}"}} {_quantile(recent, q)!r}')
+            lines.append(f'{metric}_sum{{stage="{stage}"}} {getattr(s, f"{name}_sum")!r}')
+            lines.append(f'{metric}_count{{stage="{stage}"}} {s.count}')
+    lines.append("# HELP quote_stage_bytes_total Bytes produced by quote generation stages.")
+    lines.append("# TYPE quote_stage_bytes_total counter")
+    for stage, s in snapshot:
+        lines.append(f'quote_stage_bytes_total{{stage="{stage}"}} {s.bytes}')
+    lines.append("# HELP quote_stage_errors_total Quote generation stages that raised.")
+    lines.append("# TYPE quote_stage_errors_total counter")
+    for stage, s in snapshot:
+        lines.append(f'quote_stage_errors_total{{stage="{stage}"}} {s.errors}')
+    return "\n".join(lines) + "\n"
+
+
+def write_metrics(path):
+    """Atomically replace `path` with metrics_text()."""
+    tmp = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+    try:
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        with open(tmp, "w", encoding="utf-8") as f:
+            f.write(metrics_text())
+        os.replace(tmp, path)
+    except OSError:
+        pass
+
+
+def serve_metrics(port=None, host="127.0.0.1"):
+    """Serve metrics_text() at http://host:port/metrics from a daemon thread (once per process)."""
+    global _server
+    from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+    class Handler(BaseHTTPRequestHandler):
+        def do_GET(self):
+            if self.path.split("?", 1)[0] != "/metrics":
+                self.send_error(404)
+                return
+            body = metrics_text().encode("utf-8")
+            self.send_response(200)
+            self.send_header("Content-Type", "text/plain; version=0.0.4; charset=utf-8")
+            self.send_header("Content-Length", str(len(body)))
+            self.end_headers()
+            self.wfile.write(body)
+
+        def log_message(self, format, *args):
+            pass
+
+    with _lock:
+        if _server is None:
+            try:
+                _server = ThreadingHTTPServer((host, port or METRICS_PORT), Handler)
+            except OSError as exc:
+                # Port taken (e.g. by another Streamlit process); don't retry on every span.
+                logger.warning("metrics endpoint not started: %s", exc)
+                _server = False
+                return None
+            threading.Thread(target=_server.serve_forever, name="quote-metrics", daemon=True).start()
+    return _server or None
+
+
+def reset():
+    """Forget all aggregated metrics."""
+    with _lock:
+        _stats.clear()
@@ -0,0 +1,315 @@
+'''
+Frozen copy of calculate_price_breakdown() as it was inside app.py's
+Generate Quote handler before pricing moved to quote_engine.pricing. It is
+the reference the table-driven engine is checked against in test_pricing.py;
+don't edit it.
+'''
+import csv
+
+from quote_engine.paths import resolve_path
+
+# Loaded the way app.py loaded it (price_cad as float, thousands separators dropped).
+with open(resolve_path("pricing.csv"), newline="", encoding="utf-8") as _f:
+    PRICING = {row["item"]: float(str(row["price_cad"]).replace(",", "")) for row in csv.DictReader(_f)}
+
+
+def calculate_price_breakdown(inputs):
+    # Only include items that are present in the current PRICING dict (from pricing.csv)
+    breakdown = []
+    if "Conveyor_Variable_Speed_License" in PRICING and inputs.get("conveyor_var_speed_license"):
+        breakdown.append({
+            "Component": "Conveyor Variable Speed License",
+            "Description": "Conveyor Variable Speed License",
+            "Unit Price": PRICING.get("Conveyor_Variable_Speed_License", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("Conveyor_Variable_Speed_License", 0)
+        })
+    if "custom_ai_training" in PRICING and inputs.get("custom_ai_training"):
+        breakdown.append({
+            "Component": "Custom AI Training",
+            "Description": "Custom AI Training",
+            "Unit Price": PRICING.get("custom_ai_training", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("custom_ai_training", 0)
+        })
+    if "robot_validator_license" in PRICING and inputs.get("robot_validator_license"):
+        breakdown.append({
+            "Component": "Robot Validator License",
+            "Description": "Robot Validator License",
+            "Unit Price": PRICING.get("robot_validator_license", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("robot_validator_license", 0)
+        })
+    if "GreyParrot_Monitoring_Unit" in PRICING and inputs.get("greyparrot_monitoring_unit"):
+        breakdown.append({
+            "Component": "GreyParrot Monitoring Unit",
+            "Description": "GreyParrot Monitoring Unit",
+            "Unit Price": PRICING.get("GreyParrot_Monitoring_Unit", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("GreyParrot_Monitoring_Unit", 0)
+        })
+    if "installation_Supervision" in PRICING and inputs.get("installation_supervision"):
+        breakdown.append({
+            "Component": "Installation Supervision",
+            "Description": "Installation Supervision",
+            "Unit Price": PRICING.get("installation_Supervision", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("installation_Supervision", 0)
+        })
+    if "Additional_Sorting_recipes" in PRICING and inputs.get("additional_sorting_recipes"):
+        breakdown.append({
+            "Component": "Additional Sorting Recipes",
+            "Description": "Additional Sorting Recipes",
+            "Unit Price": PRICING.get("Additional_Sorting_recipes", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("Additional_Sorting_recipes", 0)
+        })
+    if "SAT_to_CFA" in PRICING and inputs.get("sat_to_cfa"):
+        breakdown.append({
+            "Component": "SAT to CFA",
+            "Description": "SAT to CFA",
+            "Unit Price": PRICING.get("SAT_to_CFA", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("SAT_to_CFA", 0)
+        })
+    if "Engineering_&_Documentation" in PRICING and inputs.get("engineering_and_documentation"):
+        breakdown.append({
+            "Component": "Engineering & Documentation",
+            "Description": "Engineering & Documentation",
+            "Unit Price": PRICING.get("Engineering_&_Documentation", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("Engineering_&_Documentation", 0)
+        })
+    if "Online_Commisioning" in PRICING and inputs.get("online_commissioning"):
+        breakdown.append({
+            "Component": "Online Commissioning",
+            "Description": "Online Commissioning",
+            "Unit Price": PRICING.get("Online_Commisioning", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("Online_Commisioning", 0)
+        })
+    if "Installation_Commisioning_&_Training" in PRICING and inputs.get("installation_commissioning_training"):
+        breakdown.append({
+            "Component": "Installation, Commissioning & Training",
+            "Description": "Installation, Commissioning & Training",
+            "Unit Price": PRICING.get("Installation_Commisioning_&_Training", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("Installation_Commisioning_&_Training", 0)
+        })
+    if "LIPS2_support" in PRICING and inputs.get("lips2_support"):
+        breakdown.append({
+            "Component": "LIPS2 Support",
+            "Description": "LIPS2 Support",
+            "Unit Price": PRICING.get("LIPS2_support", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("LIPS2_support", 0)
+        })
+
+    # Key mappings for CSV
+    robot_key_map = {
+        "Fanuc LR-Mate": "Fanuc_LR-Mate",
+        "FanucLr10iA": "FanucLr10iA",
+        "Fanuc Delta DR3": "Fanuc_Delta_DR3",
+        "Fanuc M10": "Fanuc_M10",
+        "Fanuc M20": "Fanuc_M20",
+        "Fanuc M710": "Fanuc_M710"
+    }
+    gripper_key_map = {
+        "VentuR": "VentuR",
+        "BagR": "BagR",
+        "BagR CO": "BagR_CO",
+        "PinchR Lr & M10": "PinchR_Lr_&_M10",
+        "MonstR": "MonstR",
+        "DagR": "DagR"
+    }
+    vision_key_map = {
+        "DeepVision System": "DeepVision_System",
+        "HyperVision System": "HyperVision_System"
+    }
+
+    # Robot Base key mapping (update as per your CSV keys)
+    base_key_map = {
+        "LrMate/Lr10ia": "LrMate/Lr10ia",
+        "Delta DR3": "Delta_DR3",
+        "M-10, M-20, M-710": "M10_M20_M710"
+    }
+
+    # Robot Arms (by type and quantity)
+    if isinstance(inputs["robot_type"], dict):
+        for rtype, qty in inputs["robot_type"].items():
+            price_key = robot_key_map.get(rtype, rtype)
+            price = PRICING.get(price_key, 0)
+            breakdown.append({
+                "Component": "Robot Arm",
+                "Description": rtype,
+                "Unit Price": price,
+                "Qty": qty,
+                "Subtotal": price * qty
+            })
+    else:
+        price_key = robot_key_map.get(inputs["robot_type"], inputs["robot_type"])
+        price = PRICING.get(price_key, 0)
+        breakdown.append({
+            "Component": "Robot Arm",
+            "Description": inputs["robot_type"],
+            "Unit Price": price,
+            "Qty": inputs["robot_arms"],
+            "Subtotal": price * inputs["robot_arms"]
+        })
+
+    # Robot Bases (by type and quantity)
+    if "robot_bases" in inputs and isinstance(inputs["robot_bases"], dict):
+        for btype, qty in inputs["robot_bases"].items():
+            price_key = base_key_map.get(btype, btype)
+            price = PRICING.get(price_key, 0)
+            breakdown.append({
+                "Component": "Robot Base",
+                "Description": btype,
+                "Unit Price": price,
+                "Qty": qty,
+                "Subtotal": price * qty
+            })
+
+    # Grippers (by type and quantity)
+    if isinstance(inputs["gripper_type"], dict):
+        for gtype, qty in inputs["gripper_type"].items():
+            price_key = gripper_key_map.get(gtype, gtype)
+            price = PRICING.get(price_key, 0)
+            breakdown.append({
+                "Component": "Gripper",
+                "Description": gtype,
+                "Unit Price": price,
+                "Qty": qty,
+                "Subtotal": price * qty
+            })
+    else:
+        price_key = gripper_key_map.get(inputs["gripper_type"], inputs["gripper_type"])
+        price = PRICING.get(price_key, 0)
+        breakdown.append({
+            "Component": "Gripper",
+            "Description": str(inputs["gripper_type"]),
+            "Unit Price": price,
+            "Qty": 1,
+            "Subtotal": price
+        })
+
+    # Conveyor (only if present in pricing)
+    if "conveyor" in PRICING and inputs["conveyor_included"] == "Yes":
+        breakdown.append({
+            "Component": "Conveyor",
+            "Description": f"{inputs['conveyor_size']} inch belt",
+            "Unit Price": PRICING.get("conveyor", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("conveyor", 0)
+        })
+
+    # Vision Systems (by type and quantity)
+    if "vision_system" in inputs and isinstance(inputs["vision_system"], dict):
+        for vtype, qty in inputs["vision_system"].items():
+            price_key = vision_key_map.get(vtype, vtype)
+            price = PRICING.get(price_key, 0)
+            breakdown.append({
+                "Component": "Vision System",
+                "Description": vtype,
+                "Unit Price": price,
+                "Qty": qty,
+                "Subtotal": price * qty
+            })
+
+
+    if inputs.get("try_and_buy"):
+        breakdown.append({
+            "Component": "Try & Buy Second Arm",
+            "Description": "Deferred Payment",
+            "Unit Price": PRICING.get("try_and_buy_arm", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("try_and_buy_arm", 0)
+        })
+
+
+    # Shipping logic: by truck or by boat (container)
+    shipping_method = inputs.get("shipping_method", "Truck")
+    num_units = int(inputs.get("num_trucks_or_containers", 1))
+    if shipping_method == "Truck":
+        unit_price = PRICING.get("shipping_truck", 8250)
+        desc = f"{num_units} truck(s) at ${unit_price:,.0f}/truck"
+    else:
+        unit_price = PRICING.get("shipping_boat_container", 11000)
+        desc = f"{num_units} container(s) at ${unit_price:,.0f}/container (boat)"
+    shipping_cost = unit_price * num_units
+    breakdown.append({
+        "Component": "Shipping",
+        "Description": desc,
+        "Unit Price": unit_price,
+        "Qty": num_units,
+        "Subtotal": shipping_cost
+    })
+
+
+
+    if inputs.get("safety_fencing"):
+        breakdown.append({
+            "Component": "Safety Fencing",
+            "Description": "Robot safety fencing",
+            "Unit Price": PRICING.get("safety_fencing", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("safety_fencing", 0)
+        })
+
+    # Warranty options
+    if inputs["warranty_option"] == "1 Year (Standard)":
+        breakdown.append({
+            "Component": "Warranty (1 year)",
+            "Description": "Parts + labor coverage (1 year)",
+            "Unit Price": PRICING.get("warranty_1yr", PRICING.get("warranty", 0)),
+            "Qty": 1,
+            "Subtotal": PRICING.get("warranty_1yr", PRICING.get("warranty", 0))
+        })
+    elif inputs["warranty_option"] == "Extended":
+        breakdown.append({
+            "Component": "Warranty (Extended)",
+            "Description": "Parts + labor coverage (Extended)",
+            "Unit Price": PRICING.get("warranty_extended", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("warranty_extended", 0)
+        })
+
+    if inputs.get("pe_stamp"):
+        breakdown.append({
+            "Component": "PE Stamp",
+            "Description": "Professional engineer review",
+            "Unit Price": PRICING.get("pe_stamp", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("pe_stamp", 0)
+        })
+
+    if inputs.get("sat"):
+        breakdown.append({
+            "Component": "Site Acceptance Test (SAT)",
+            "Description": "Final performance check",
+            "Unit Price": PRICING.get("sat", 0),
+            "Qty": 1,
+            "Subtotal": PRICING.get("sat", 0)
+        })
+
+    # Add backup gripper if selected
+    if inputs.get("add_backup_gripper") and inputs.get("backup_gripper"):
+        gripper_key_map = {
+            "VentuR": "VentuR",
+            "BagR": "BagR",
+            "BagR CO": "BagR_CO",
+            "PinchR Lr & M10": "PinchR_Lr_&_M10",
+            "MonstR": "MonstR",
+            "DagR": "DagR"
+        }
+        backup_key = gripper_key_map.get(inputs["backup_gripper"], inputs["backup_gripper"])
+        backup_price = PRICING.get(backup_key, 0)
+        breakdown.append({
+            "Component": "Backup Gripper",
+            "Description": f"Backup: {inputs['backup_gripper']}",
+            "Unit Price": backup_price,
+            "Qty": 1,
+            "Subtotal": backup_price
+        })
+
+    return breakdown
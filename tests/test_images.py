@@ -0,0 +1,53 @@
+'''
+Derivative caches stay bounded: QUOTE_IMAGE_CACHE_ENTRIES in memory (least
+recently used dropped first) and QUOTE_IMAGE_CACHE_MB on disk.
+'''
+import os
+from collections import OrderedDict
+
+import pytest
+from PIL import Image
+
+from quote_engine import images
+
+
+@pytest.fixture
+def cache(tmp_path, monkeypatch):
+    image_dir = tmp_path / "images"
+    image_dir.mkdir()
+    monkeypatch.setattr(images, "_derivatives", OrderedDict())
+    monkeypatch.setattr(images, "IMAGE_DIR", str(image_dir))
+    monkeypatch.setattr(images, "cache_path", lambda *parts: os.path.join(tmp_path, *parts))
+    monkeypatch.setattr(images, "get_bundle", lambda: None)
+    return image_dir
+
+
+def sources(tmp_path, count):
+    paths = []
+    for i in range(count):
+        path = tmp_path / f"source_{i}.png"
+        Image.new("RGB", (400, 300), (i * 40, 0, 0)).save(path)
+        paths.append(str(path))
+    return paths
+
+
+def test_memory_cache_drops_least_recently_used(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "IMAGE_CACHE_ENTRIES", 2)
+    first, second, third = sources(tmp_path, 3)
+    images.sized_image(first, width=images.EMU_PER_INCH)
+    images.sized_image(second, width=images.EMU_PER_INCH)
+    images.sized_image(first, width=images.EMU_PER_INCH)  # now most recent
+    images.sized_image(third, width=images.EMU_PER_INCH)
+    digests = [key.split("_", 1)[0] for key in images._derivatives]
+    assert digests == [images.source_digest(first)[:32], images.source_digest(third)[:32]]
+
+
+def test_disk_cache_is_evicted_to_its_cap(cache, tmp_path, monkeypatch):
+    monkeypatch.setattr(images, "IMAGE_CACHE_MB", 0)
+    paths = sources(tmp_path, 3)
+    for path in paths:
+        data = images.sized_image(path, width=images.EMU_PER_INCH).getvalue()
+    # Only the derivative just written survives a zero-byte cap.
+    (kept,) = os.listdir(cache)
+    with open(cache / kept, "rb") as f:
+        assert f.read() == data
@@ -0,0 +1,78 @@
+'''
+Job queue limits: uncollected results count against QUOTE_JOB_WORKERS +
+QUOTE_JOB_QUEUE_DEPTH, only results no page is polling for are dropped to
+make room, and forget() drops queued and running jobs. Jobs are never run;
+the tests move them through their states by hand.
+'''
+import time
+
+import pytest
+
+from quote_engine import jobs
+
+
+class _IdlePool:
+    def submit(self, fn, *args):
+        pass
+
+
+@pytest.fixture(autouse=True)
+def queue(monkeypatch):
+    monkeypatch.setattr(jobs, "JOB_WORKERS", 1)
+    monkeypatch.setattr(jobs, "JOB_QUEUE_DEPTH", 1)
+    monkeypatch.setattr(jobs, "_jobs", {})
+    monkeypatch.setattr(jobs, "_executor", lambda: _IdlePool())
+    monkeypatch.setattr(jobs.api, "validate", lambda quote: quote)
+
+
+def finish(job_id, ago=0.0):
+    # Finished, and last polled, `ago` seconds back.
+    job = jobs._jobs[job_id]
+    job._start([])
+    job._finish()
+    job.finished = job.polled = time.time() - ago
+
+
+def test_pending_jobs_fill_the_limit():
+    jobs.submit({})
+    jobs.submit({})
+    with pytest.raises(jobs.JobQueueFull):
+        jobs.submit({})
+
+
+def test_abandoned_result_makes_room():
+    old = jobs.submit({})
+    other = jobs.submit({})
+    finish(old, ago=jobs.JOB_POLL_GRACE + 1)
+    new = jobs.submit({})
+    assert jobs.get(old) is None
+    assert set(jobs._jobs) == {other, new}
+
+
+def test_polled_result_is_kept():
+    polled = jobs.submit({})
+    jobs.submit({})
+    finish(polled)
+    with pytest.raises(jobs.JobQueueFull):
+        jobs.submit({})
+    assert jobs.get(polled) is not None
+
+
+def test_result_expires_after_ttl_without_polls():
+    job_id = jobs.submit({})
+    finish(job_id, ago=jobs.JOB_RESULT_TTL + 1)
+    assert jobs.get(job_id) is None
+
+
+def test_forget_queued_and_running_jobs():
+    queued = jobs.submit({})
+    running = jobs.submit({})
+    jobs._jobs[running]._start([])
+    jobs.forget(queued)
+    jobs.forget(running)
+    assert queued not in jobs._jobs
+    # Still holding a worker until it finishes, so it stays counted.
+    assert jobs._jobs[running].forgotten
+    jobs.submit({})
+    with pytest.raises(jobs.JobQueueFull):
+        jobs.submit({})
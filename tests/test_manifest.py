@@ -0,0 +1,39 @@
+'''
+Manifest refresh: an image copied over in place (same folder, folder mtime
+unchanged) must give a new content hash, and with it a new assets version
+for the artifact cache key.
+'''
+import os
+
+from PIL import Image
+
+from quote_engine import artifacts, manifest
+
+CONFIG_ID = "1arms_fanuc_m20_ftf_1800_venturr"
+
+
+def write_png(path, size):
+    Image.new("RGB", size, "white").save(path)
+
+
+def test_image_overwritten_in_place(tmp_path, monkeypatch):
+    monkeypatch.setattr(manifest, "MANIFEST_CHECK_SECONDS", 0)
+    folder = tmp_path / "Assets" / CONFIG_ID
+    folder.mkdir(parents=True)
+    iso = folder / "iso.png"
+    write_png(iso, (10, 10))
+
+    before = manifest.get_manifest(str(tmp_path))
+    old_hash = before.info(str(iso)).sha256
+    old_version = artifacts._assets_version(before)
+
+    folder_stat = os.stat(folder)
+    write_png(iso, (20, 10))
+    os.utime(folder, ns=(folder_stat.st_atime_ns, folder_stat.st_mtime_ns))
+    assert manifest.directory_stamp(str(tmp_path)) == before.stamp
+
+    after = manifest.get_manifest(str(tmp_path))
+    info = after.info(str(iso))
+    assert info.sha256 != old_hash
+    assert (info.width, info.height) == (20, 10)
+    assert artifacts._assets_version(after) != old_version
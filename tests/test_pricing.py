@@ -0,0 +1,67 @@
+'''
+Golden test: the table-driven pricing engine against the original
+calculate_price_breakdown() (tests/legacy_pricing.py) on seeded random
+configurations covering every flag, option and quantity the form offers.
+'''
+import random
+
+import pytest
+
+from quote_engine.pricing import calculate_price_breakdown
+from tests.legacy_pricing import calculate_price_breakdown as legacy_price_breakdown
+
+FLAGS = [
+    "conveyor_var_speed_license", "custom_ai_training", "robot_validator_license", "greyparrot_monitoring_unit",
+    "installation_supervision", "additional_sorting_recipes", "sat_to_cfa", "engineering_and_documentation",
+    "online_commissioning", "installation_commissioning_training", "lips2_support", "safety_fencing", "try_and_buy",
+]
+ROBOTS = ["Fanuc LR-Mate", "FanucLr10iA", "Fanuc Delta DR3", "Fanuc M10", "Fanuc M20", "Fanuc M710"]
+BASES = ["LrMate/Lr10ia", "Delta DR3", "M-10, M-20, M-710"]
+GRIPPERS = ["VentuR", "BagR", "BagR CO", "PinchR Lr & M10", "MonstR", "DagR"]
+VISION = ["DeepVision System", "HyperVision System"]
+CONFIGURATIONS = 3000
+
+
+def random_inputs(rnd):
+    def pick(options):
+        return {option: rnd.randint(1, 4) for option in rnd.sample(options, rnd.randint(0, len(options)))}
+
+    inputs = {flag: rnd.random() < 0.5 for flag in FLAGS}
+    inputs.update(
+        robot_type=pick(ROBOTS),
+        robot_bases=pick(BASES),
+        gripper_type=pick(GRIPPERS),
+        vision_system=pick(VISION),
+        shipping_method=rnd.choice(["Truck", "Boat"]),
+        num_trucks_or_containers=rnd.randint(1, 5),
+        warranty_option=rnd.choice(["None", "1 Year (Standard)", "Extended"]),
+    )
+    inputs["add_backup_gripper"] = rnd.random() < 0.5
+    inputs["backup_gripper"] = rnd.choice(GRIPPERS) if inputs["add_backup_gripper"] else None
+    inputs["robot_arms"] = sum(inputs["robot_type"].values())
+    return inputs
+
+
+def test_matches_legacy_breakdown():
+    rnd = random.Random(0)
+    for i in range(CONFIGURATIONS):
+        inputs = random_inputs(rnd)
+        assert calculate_price_breakdown(inputs) == legacy_price_breakdown(inputs), f"configuration {i}: {inputs}"
+
+
+@pytest.mark.parametrize("warranty", ["None", "1 Year (Standard)", "Extended"])
+def test_everything_selected(warranty):
+    inputs = dict.fromkeys(FLAGS, True)
+    inputs.update(
+        robot_type=dict.fromkeys(ROBOTS, 2),
+        robot_bases=dict.fromkeys(BASES, 2),
+        gripper_type=dict.fromkeys(GRIPPERS, 2),
+        vision_system=dict.fromkeys(VISION, 1),
+        shipping_method="Boat",
+        num_trucks_or_containers=3,
+        warranty_option=warranty,
+        add_backup_gripper=True,
+        backup_gripper="BagR CO",
+        robot_arms=12,
+    )
+    assert calculate_price_breakdown(inputs) == legacy_price_breakdown(inputs)